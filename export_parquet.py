@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Export scraped listings to Parquet or Arrow IPC for analytics.
+
+Columns are typed (year as int16, listing_id as uint64, seller_verified as
+bool, scraped_at as a timestamp) and the low-cardinality text columns are
+dictionary-encoded. Every row group holds a single partition key
+(category or scrape date), so readers can skip whole groups by column
+statistics and only read the columns they ask for.
+
+The CSV export first spills rows into one temporary file per key and then
+writes the keys one after another, so memory stays flat however large
+the input is. An existing output file is never overwritten.
+
+Usage:
+    python export_parquet.py machines.csv -o machines.parquet
+    python export_parquet.py a.csv b.csv -o listings.arrows --partition-by date
+
+Requires pyarrow (optional dependency, only needed for this export).
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for this export
+    pa = None
+
+from scraper import CSV_FIELDS
+
+ROW_GROUP_SIZE = 100_000  # rows buffered in total before a flush
+COMPRESSION = "zstd"
+MAX_SPILL_FILES = 128  # spill files kept open at once during export
+
+# Low-cardinality columns stored as dictionary<int32, string>
+DICTIONARY_FIELDS = [
+    "manufacturer", "condition", "currency", "country", "seller_name",
+    "category", "source",
+]
+PARTITION_KEYS = {
+    "category": lambda row: row.get("category") or "",
+    "date": lambda row: (row.get("scraped_at") or "")[:10],
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        sys.exit("pyarrow is required for this export: pip install pyarrow")
+
+
+def build_schema():
+    """Arrow schema for CSV_FIELDS with typed and dictionary columns."""
+    _require_pyarrow()
+    types = {
+        "year": pa.int16(),
+        "listing_id": pa.uint64(),
+        "seller_verified": pa.bool_(),
+        "scraped_at": pa.timestamp("s"),
+    }
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    fields = []
+    for name in CSV_FIELDS:
+        if name in DICTIONARY_FIELDS:
+            fields.append(pa.field(name, dictionary))
+        else:
+            fields.append(pa.field(name, types.get(name, pa.string())))
+    return pa.schema(fields)
+
+
+def _to_int(value):
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def _to_bool(value):
+    value = (value or "").strip().lower()
+    if value in ("yes", "true", "1"):
+        return True
+    if value in ("no", "false", "0"):
+        return False
+    return None
+
+
+def _to_timestamp(value):
+    try:
+        return datetime.strptime((value or "").strip(), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+_CONVERTERS = {
+    "year": _to_int,
+    "listing_id": _to_int,
+    "seller_verified": _to_bool,
+    "scraped_at": _to_timestamp,
+}
+
+
+class ListingTableWriter:
+    """Streaming writer for listing rows (dicts keyed by CSV_FIELDS).
+
+    Rows are buffered per partition key and flushed, one row group per
+    key, once ROW_GROUP_SIZE rows are waiting in total and on close().
+    The file is only readable after close(); path must not exist yet.
+    """
+
+    def __init__(self, path, fmt="parquet", partition_by="category",
+                 row_group_size=ROW_GROUP_SIZE):
+        if os.path.exists(path):
+            raise FileExistsError(f"{path} already exists")
+        self.path = path
+        self.schema = build_schema()
+        self.partition_key = PARTITION_KEYS[partition_by]
+        self.row_group_size = row_group_size
+        self.buffers = defaultdict(list)
+        self.buffered = 0
+        self.rows_written = 0
+        self.fmt = fmt
+        if fmt == "parquet":
+            self.writer = pq.ParquetWriter(
+                path, self.schema, compression=COMPRESSION,
+            )
+        else:
+            # The stream format (unlike the IPC file format) allows each
+            # batch to carry its own dictionaries
+            self.writer = ipc.new_stream(path, self.schema)
+
+    def write(self, row):
+        self.buffers[self.partition_key(row)].append(row)
+        self.buffered += 1
+        if self.buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered key as its own row group."""
+        for key in sorted(self.buffers):
+            self._flush(key)
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+    def _flush(self, key):
+        rows = self.buffers.pop(key, None)
+        if not rows:
+            return
+        columns = []
+        for field in self.schema:
+            convert = _CONVERTERS.get(field.name)
+            values = [row.get(field.name) for row in rows]
+            if convert:
+                values = [convert(v) for v in values]
+            else:
+                values = [v if v else None for v in values]
+            if pa.types.is_dictionary(field.type):
+                array = pa.array(values, type=pa.string()).dictionary_encode()
+            else:
+                array = pa.array(values, type=field.type)
+            columns.append(array)
+        batch = pa.record_batch(columns, schema=self.schema)
+        if self.fmt == "parquet":
+            self.writer.write_batch(batch, row_group_size=len(rows))
+        else:
+            self.writer.write_batch(batch)
+        self.rows_written += len(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _spill_by_key(csv_paths, partition_key, spill_dir):
+    """Copy rows into one CSV per partition key; returns {key: path}."""
+    paths = {}
+    handles = OrderedDict()  # key -> (file, csv writer), least recent first
+    try:
+        for path in csv_paths:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    key = partition_key(row)
+                    if key in handles:
+                        handles.move_to_end(key)
+                        writer = handles[key][1]
+                    else:
+                        if len(handles) >= MAX_SPILL_FILES:
+                            handles.popitem(last=False)[1][0].close()
+                        new = key not in paths
+                        if new:
+                            paths[key] = os.path.join(spill_dir, f"{len(paths)}.csv")
+                        spill = open(paths[key], "a", newline="", encoding="utf-8")
+                        writer = csv.DictWriter(spill, fieldnames=CSV_FIELDS,
+                                                extrasaction="ignore")
+                        if new:
+                            writer.writeheader()
+                        handles[key] = (spill, writer)
+                    writer.writerow(row)
+    finally:
+        for spill, _ in handles.values():
+            spill.close()
+    return paths
+
+
+def export(csv_paths, output, fmt="parquet", partition_by="category"):
+    """Stream one or more listing CSVs into a single columnar file."""
+    partition_key = PARTITION_KEYS[partition_by]
+    with ListingTableWriter(output, fmt=fmt, partition_by=partition_by) as writer, \
+            tempfile.TemporaryDirectory(prefix="export_parquet_") as spill_dir:
+        spills = _spill_by_key(csv_paths, partition_key, spill_dir)
+        for key in sorted(spills):
+            with open(spills[key], newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    writer.write(row)
+            writer.flush()
+    return writer.rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export scraped listings to Parquet or Arrow IPC"
+    )
+    parser.add_argument("csv", nargs="+", help="Listing CSV file(s)")
+    parser.add_argument(
+        "-o", "--output", required=True,
+        help="Output file (.parquet, or .arrows for an Arrow IPC stream)",
+    )
+    parser.add_argument(
+        "--format", choices=["parquet", "ipc"], default=None,
+        help="Output format (default: from the output file extension)",
+    )
+    parser.add_argument(
+        "--partition-by", choices=sorted(PARTITION_KEYS), default="category",
+        help="Split row groups by category or scrape date (default: category)",
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} already exists")
+
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output)[1].lower()
+        fmt = "ipc" if ext in (".arrows", ".arrow", ".ipc") else "parquet"
+
+    count = export(args.csv, args.output, fmt=fmt, partition_by=args.partition_by)
+    print(f"Exported {count} listings -> {args.output} ({fmt})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Resolve listing locations to coordinates and shipping legs, offline.
+
+The free-text location/country fields ("Lwowska 55, 35-505 Rzeszów,
+Polska") are matched against a local gazetteer (data/gazetteer.csv) to get
+coordinates and an ISO country code. From there the nearest European
+export port and the road distance to it are computed, plus the sea
+distance from that port to every destination port in data/ports.json.
+
+Results are memoized per normalized location string in a persistent
+cache (geocode_cache.json), so the many listings sharing a seller address
+cost one lookup between them, and nothing at all on later runs. The cache
+is dropped automatically when the gazetteer or ports file changes.
+
+Usage:
+    python geocode_locations.py machines.csv -o machines_geo.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GAZETTEER_FILE = os.path.join(DATA_DIR, "gazetteer.csv")
+PORTS_FILE = os.path.join(DATA_DIR, "ports.json")
+CACHE_FILE = "geocode_cache.json"
+
+EARTH_RADIUS_KM = 6371.0
+ROAD_FACTOR = 1.3  # road distance vs. great-circle distance
+
+GEO_FIELDS = [
+    "country_code", "lat", "lon", "geo_precision", "export_port", "road_km",
+]
+
+
+def normalize_location(text):
+    """Canonical cache key for a location string."""
+    text = unicodedata.normalize("NFC", text or "")
+    text = text.replace('"', "").lower()
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """Return ({name: country entry}, {name: [city entries]})."""
+    countries, cities = {}, {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            entry = {
+                "country_code": row["country_code"],
+                "lat": float(row["lat"]),
+                "lon": float(row["lon"]),
+            }
+            name = normalize_location(row["name"])
+            if row["kind"] == "country":
+                countries[name] = entry
+            else:
+                cities.setdefault(name, []).append(entry)
+    return countries, cities
+
+
+def load_ports(path=PORTS_FILE):
+    """Return (origin ports, destination ports) from the ports config."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return config["origin_ports"], config["destination_ports"]
+
+
+def _fingerprint(*paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _place_name(part):
+    """Drop postal codes and house numbers: '35-505 rzeszów' -> 'rzeszów'."""
+    words = [w for w in part.split() if not any(c.isdigit() for c in w)]
+    return " ".join(words)
+
+
+class Geocoder:
+    """Gazetteer lookup plus port legs, memoized in a persistent cache."""
+
+    def __init__(self, gazetteer_path=GAZETTEER_FILE, ports_path=PORTS_FILE,
+                 cache_path=CACHE_FILE):
+        self.countries, self.cities = load_gazetteer(gazetteer_path)
+        self.origin_ports, self.destination_ports = load_ports(ports_path)
+        self.cache_path = cache_path
+        self.fingerprint = _fingerprint(gazetteer_path, ports_path)
+        self.cache = {}
+        self.misses = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("fingerprint") == self.fingerprint:
+                self.cache = stored.get("entries", {})
+
+    @property
+    def fields(self):
+        """Output columns: GEO_FIELDS plus one sea distance per destination."""
+        return GEO_FIELDS + [f"sea_nm_{port}" for port in self.destination_ports]
+
+    def lookup(self, location, country=""):
+        """Return the geo fields for one listing (cached)."""
+        key = f"{normalize_location(location)}|{normalize_location(country)}"
+        result = self.cache.get(key)
+        if result is None:
+            self.misses += 1
+            result = self._resolve(location, country)
+            self.cache[key] = result
+        return result
+
+    def save(self):
+        if self.cache_path:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint,
+                           "entries": self.cache}, f, ensure_ascii=False)
+
+    def _resolve(self, location, country):
+        parts = [_place_name(p) for p in normalize_location(location).split(",")]
+        parts = [p for p in parts if p]
+
+        country_entry = None
+        for part in reversed(parts):
+            country_entry = self.countries.get(part)
+            if country_entry:
+                parts.remove(part)
+                break
+        if country_entry is None:
+            # The country column is sometimes noise (e.g. "1.229 km")
+            country_entry = self.countries.get(normalize_location(country))
+
+        match, precision = None, ""
+        for part in reversed(parts):
+            candidates = self.cities.get(part, [])
+            if country_entry:
+                candidates = [c for c in candidates
+                              if c["country_code"] == country_entry["country_code"]]
+            if candidates:
+                match, precision = candidates[0], "city"
+                break
+        if match is None and country_entry:
+            match, precision = country_entry, "country"
+        if match is None:
+            return {field: "" for field in self.fields}
+
+        result = {
+            "country_code": match["country_code"],
+            "lat": match["lat"],
+            "lon": match["lon"],
+            "geo_precision": precision,
+        }
+        result.update(self._legs(match["lat"], match["lon"]))
+        return result
+
+    def _legs(self, lat, lon):
+        """Road leg to the nearest export port, sea legs to destinations."""
+        port_id, port = min(
+            self.origin_ports.items(),
+            key=lambda item: haversine_km(lat, lon, item[1]["lat"], item[1]["lon"]),
+        )
+        road_km = haversine_km(lat, lon, port["lat"], port["lon"]) * ROAD_FACTOR
+        legs = {"export_port": port_id, "road_km": round(road_km)}
+        for dest_id, dest in self.destination_ports.items():
+            legs[f"sea_nm_{dest_id}"] = port["nm_to_aden"] + dest["nm_from_aden"]
+        return legs
+
+
+def geocode_csv(input_path, output_path, geocoder):
+    """Copy a listings CSV, appending the geo columns to every row."""
+    rows = 0
+    with open(input_path, newline="", encoding="utf-8") as src, \
+            open(output_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        fieldnames = list(reader.fieldnames or [])
+        fieldnames += [f for f in geocoder.fields if f not in fieldnames]
+        writer = csv.DictWriter(dst, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in reader:
+            row.update(geocoder.lookup(row.get("location", ""),
+                                       row.get("country", "")))
+            writer.writerow(row)
+            rows += 1
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Add coordinates and port distances to scraped listings"
+    )
+    parser.add_argument("csv", help="Listing CSV file")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    parser.add_argument(
+        "--cache", type=str, default=CACHE_FILE,
+        help=f"Persistent lookup cache (default: {CACHE_FILE})",
+    )
+    args = parser.parse_args()
+
+    geocoder = Geocoder(cache_path=args.cache)
+    rows = geocode_csv(args.csv, args.output, geocoder)
+    geocoder.save()
+    print(f"Geocoded {rows} listings ({geocoder.misses} new lookups) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
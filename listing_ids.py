@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Compact on-disk set of scraped listing IDs.
+
+The scraper checks every discovered URL against the IDs it already has.
+Kept as a Python set of strings, millions of historical IDs cost hundreds
+of MB and seconds of JSON parsing at startup. ListingIdSet stores them as
+a sorted array of uint64 instead:
+
+  <path>      header (magic, count) followed by the sorted IDs, opened
+              with mmap so startup does no parsing and only the pages a
+              binary search touches are read. Several processes opening
+              the same file share one copy in the OS page cache.
+  <path>.log  IDs added since the last compaction, appended on save().
+
+IDs added during a run live in an in-memory delta set (replayed from the
+journal on open). Once the delta reaches COMPACT_THRESHOLD, and on
+close(), it is merged into a new base file that replaces the old one.
+
+Processes sharing a set coordinate through flock on <path>.lock: reading
+and appending to the journal take a shared lock, compaction an exclusive
+one. Compaction merges the current base and journal on disk, not the
+snapshot this process opened, so IDs saved by other processes are kept.
+Where flock is unavailable (Windows) no lock is taken, and a set must not
+be shared between processes.
+
+Numeric IDs are stored as their value. Other keys (e.g. "source:slug")
+are stored as a 63-bit BLAKE2 hash with the top bit set. Both files use
+the machine's native byte order.
+
+Usage:
+
+    ids = ListingIdSet("scraper_progress.ids")
+    if "12345678" not in ids:
+        ids.add("12345678")
+    ids.save()
+    ids.close()
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+MAGIC = b"MBIDSET1"
+HEADER = struct.Struct("=8sQ")  # magic, number of IDs
+COMPACT_THRESHOLD = 100_000  # delta size that triggers a merge on save()
+HASHED_BIT = 1 << 63
+MAX_NUMERIC_DIGITS = 18  # always below HASHED_BIT
+
+_ITEM = array("Q").itemsize
+
+
+def encode(key):
+    """uint64 value for a listing key."""
+    if isinstance(key, int):
+        return key
+    if key.isascii() and key.isdigit() and len(key) <= MAX_NUMERIC_DIGITS:
+        return int(key)
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | HASHED_BIT
+
+
+def _contains(ids, value):
+    """Binary search a sorted uint64 view."""
+    i = bisect.bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+
+def remove(path):
+    """Delete an ID set's base file and journal."""
+    for f in (path, f"{path}.log", f"{path}.lock"):
+        if os.path.exists(f):
+            os.remove(f)
+
+
+class ListingIdSet:
+    """Sorted uint64 IDs memory-mapped from disk plus an in-memory delta."""
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = f"{path}.log"
+        self.lock_path = f"{path}.lock"
+        self.delta = set()
+        self._pending = array("Q")  # added but not yet in the journal
+        with self._locked():
+            self._map, self._ids = self._open_base()
+            self.delta.update(v for v in self._read_journal()
+                              if not self._in_base(v))
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        """Hold a shared or exclusive flock on the set's lock file."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_journal(self):
+        journal = array("Q")
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+            # Ignore a partly written trailing entry
+            journal.frombytes(data[:len(data) - len(data) % _ITEM])
+        return journal
+
+    def _open_base(self):
+        """Return (mmap, uint64 view) of the base file, or (None, ())."""
+        if not os.path.exists(self.path):
+            return None, ()
+        with open(self.path, "rb") as f:
+            magic, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a listing ID set")
+            if not count:
+                return None, ()
+            base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = HEADER.size + count * _ITEM
+        return base, memoryview(base)[HEADER.size:end].cast("Q")
+
+    def _in_base(self, value):
+        return _contains(self._ids, value)
+
+    def __contains__(self, key):
+        value = encode(key)
+        return value in self.delta or self._in_base(value)
+
+    def __len__(self):
+        return len(self._ids) + len(self.delta)
+
+    def add(self, key):
+        value = encode(key)
+        if value in self.delta or self._in_base(value):
+            return
+        self.delta.add(value)
+        self._pending.append(value)
+
+    def save(self):
+        """Append new IDs to the journal; compact once the delta is large."""
+        if self._pending:
+            with self._locked(), open(self.journal_path, "ab") as f:
+                self._pending.tofile(f)
+            self._pending = array("Q")
+        if len(self.delta) >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        """Merge the journal and delta into a new base file."""
+        with self._locked(exclusive=True):
+            # Start from what is on disk now; another process may have
+            # compacted or appended since this one opened the set
+            base, ids = self._open_base()
+            journal = self._read_journal()
+            added = sorted(v for v in set(journal) | self.delta
+                           if not _contains(ids, v))
+            self._write_base(ids, added)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._pending = array("Q")
+
+            # Swap in the new base before dropping the delta so concurrent
+            # lookups always see every ID. Threads may still be searching
+            # the old maps; they are closed once the last reference goes.
+            self._map, self._ids = self._open_base()
+            self.delta = set()
+        if base is not None:
+            ids.release()
+            base.close()
+
+    def _write_base(self, ids, added):
+        raw = ids.cast("B") if len(ids) else b""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(ids) + len(added)))
+            # Copy runs of the old base between the insertion points, and
+            # runs of new IDs that fall between the same two base IDs
+            start, run = 0, array("Q")
+            for value in added:
+                pos = bisect.bisect_left(ids, value, start)
+                if pos != start:
+                    f.write(run.tobytes())
+                    f.write(raw[start * _ITEM:pos * _ITEM])
+                    start, run = pos, array("Q")
+                run.append(value)
+            f.write(run.tobytes())
+            f.write(raw[start * _ITEM:])
+        if len(ids):
+            raw.release()
+        os.replace(tmp, self.path)
+
+    def close(self):
+        """Compact pending IDs and unmap the base file."""
+        if self.delta:
+            self.compact()
+        if self._map is not None:
+            self._ids.release()
+            self._map.close()
+        self._map = None
+        self._ids = ()
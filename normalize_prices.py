@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Parse listing prices and precompute EUR, INR and landed-cost values.
+
+Scraped prices are raw strings in German notation ("19.000", "1.250,50")
+or placeholders such as "Preisinfo" (price not shown). They are parsed
+into exact Decimals and converted through a local, dated FX table
+(data/fx_rates.csv, units of each currency per EUR). Each conversion uses
+the latest rate on or before the listing's scrape date, and lookups are
+cached per (currency, date).
+
+A landed-cost estimate in INR is added for every destination port in
+data/ports.json. It uses the same formula as the app's calculator:
+CIF + customs duty + GST + clearing. The app can then sort and filter
+on plain numbers.
+
+Usage:
+    python normalize_prices.py machines.csv -o machines_prices.csv
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FX_RATES_FILE = os.path.join(DATA_DIR, "fx_rates.csv")
+PORTS_FILE = os.path.join(DATA_DIR, "ports.json")
+
+DEFAULT_CURRENCY = "EUR"
+# Landed cost, matching calculateLandedCost in app/src/MachinesBridge.jsx
+INSURANCE_RATE = Decimal("0.008")
+CUSTOMS_DUTY_RATE = Decimal("0.075")
+GST_RATE = Decimal("0.18")
+CLEARING_INR = Decimal("35000")
+
+CENT = Decimal("0.01")
+RUPEE = Decimal("1")
+
+_CURRENCY_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP"}
+
+
+def parse_price_value(raw):
+    """Parse a price string into a Decimal, or None if no price is given.
+
+    With both "." and "," present the last one is the decimal separator.
+    A single separator followed by exactly three digits is a thousands
+    separator ("1.250" -> 1250) unless the number starts with "0"
+    ("0.500" -> 0.500); otherwise it is a decimal point.
+    """
+    text = (raw or "").strip()
+    match = re.search(r"\d[\d.,\s]*", text)
+    if not match or re.search(r"[a-zA-Z]{4,}", text.replace(match.group(0), "")):
+        return None  # "Preisinfo", "on request", ...
+    number = re.sub(r"\s", "", match.group(0)).rstrip(".,")
+
+    if "." in number and "," in number:
+        decimal_sep = "." if number.rfind(".") > number.rfind(",") else ","
+        thousands_sep = "," if decimal_sep == "." else "."
+        number = number.replace(thousands_sep, "").replace(decimal_sep, ".")
+    elif "." in number or "," in number:
+        sep = "." if "." in number else ","
+        groups = number.split(sep)
+        if len(groups) > 2 or (len(groups[-1]) == 3 and groups[0] != "0"):
+            number = number.replace(sep, "")
+        else:
+            number = number.replace(sep, ".")
+    try:
+        return Decimal(number)
+    except InvalidOperation:
+        return None
+
+
+def detect_currency(raw, currency):
+    """Currency code from the currency column or a symbol in the price."""
+    if currency and currency.strip():
+        return currency.strip().upper()
+    for symbol, code in _CURRENCY_SYMBOLS.items():
+        if symbol in (raw or ""):
+            return code
+    return DEFAULT_CURRENCY
+
+
+class FxTable:
+    """Dated per-EUR rates with cached lookups."""
+
+    def __init__(self, path=FX_RATES_FILE):
+        self.rates = {}  # currency -> sorted [(date, per_eur)]
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.rates.setdefault(row["currency"].upper(), []).append(
+                    (row["date"], Decimal(row["per_eur"])))
+        for series in self.rates.values():
+            series.sort()
+        self.rate = lru_cache(maxsize=None)(self._rate)
+
+    def _rate(self, currency, date):
+        """Return (per_eur, rate_date) in effect on date, or (None, "")."""
+        series = self.rates.get(currency)
+        if not series:
+            return None, ""
+        dates = [d for d, _ in series]
+        # Before the first entry, fall back to the oldest known rate
+        i = max(bisect.bisect_right(dates, date or dates[-1]) - 1, 0)
+        return series[i][1], series[i][0]
+
+    def convert(self, amount, currency, to_currency, date):
+        """Convert amount between currencies at the rate for date."""
+        from_rate, fx_date = self.rate(currency, date)
+        to_rate, _ = self.rate(to_currency, date)
+        if from_rate is None or to_rate is None:
+            return None, ""
+        return amount / from_rate * to_rate, fx_date
+
+
+def load_destination_ports(path=PORTS_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["destination_ports"]
+
+
+def landed_cost_inr(price_inr, freight_inr):
+    """Total landed cost in INR for a machine price and sea freight."""
+    insurance = (price_inr + freight_inr) * INSURANCE_RATE
+    cif = price_inr + freight_inr + insurance
+    duty = cif * CUSTOMS_DUTY_RATE
+    gst = (cif + duty) * GST_RATE
+    return cif + duty + gst + CLEARING_INR
+
+
+class PriceNormalizer:
+    """Adds numeric price columns to listing rows."""
+
+    def __init__(self, fx=None, ports=None):
+        self.fx = fx or FxTable()
+        self.ports = ports if ports is not None else load_destination_ports()
+        self.fields = ["price_value", "price_currency", "price_eur",
+                       "price_inr", "fx_date"]
+        self.fields += [f"landed_inr_{port}" for port in self.ports]
+
+    def normalize(self, row):
+        values = {field: "" for field in self.fields}
+        amount = parse_price_value(row.get("price"))
+        if amount is None:
+            return values
+        currency = detect_currency(row.get("price"), row.get("currency"))
+        date = (row.get("scraped_at") or "")[:10]
+        values["price_value"] = str(amount)
+        values["price_currency"] = currency
+
+        price_eur, fx_date = self.fx.convert(amount, currency, "EUR", date)
+        if price_eur is None:
+            return values
+        price_inr, _ = self.fx.convert(price_eur, "EUR", "INR", date)
+        values["price_eur"] = str(price_eur.quantize(CENT, ROUND_HALF_UP))
+        values["fx_date"] = fx_date
+        if price_inr is None:
+            return values
+        values["price_inr"] = str(price_inr.quantize(RUPEE, ROUND_HALF_UP))
+
+        for port_id, port in self.ports.items():
+            freight_inr, _ = self.fx.convert(
+                Decimal(str(port["freight_eur"])), "EUR", "INR", date)
+            total = landed_cost_inr(price_inr, freight_inr)
+            values[f"landed_inr_{port_id}"] = str(total.quantize(RUPEE, ROUND_HALF_UP))
+        return values
+
+
+def normalize_csv(input_path, output_path, normalizer):
+    """Copy a listings CSV, appending the numeric price columns."""
+    count = priced = 0
+    with open(input_path, newline="", encoding="utf-8") as src, \
+            open(output_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        fieldnames = list(reader.fieldnames or [])
+        fieldnames += [f for f in normalizer.fields if f not in fieldnames]
+        writer = csv.DictWriter(dst, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in reader:
+            row.update(normalizer.normalize(row))
+            writer.writerow(row)
+            count += 1
+            priced += bool(row["price_eur"])
+    return count, priced
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Add exact EUR/INR prices and landed costs to listings"
+    )
+    parser.add_argument("csv", help="Listing CSV file")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    parser.add_argument(
+        "--fx-rates", type=str, default=FX_RATES_FILE,
+        help="Dated FX table (default: data/fx_rates.csv)",
+    )
+    args = parser.parse_args()
+
+    normalizer = PriceNormalizer(fx=FxTable(args.fx_rates))
+    count, priced = normalize_csv(args.csv, args.output, normalizer)
+    print(f"Normalized {count} listings ({priced} with a price) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
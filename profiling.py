@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Per-phase profiling for the scraper (--profile).
+
+Each phase (fetch, parse_html, extract, write, ...) gets its own cProfile
+profiler, so the pstats files show where time goes inside that phase only.
+A background thread samples the main thread's stack at a fixed interval
+and writes collapsed stacks ("phase;file:func;... count") that flamegraph
+tools such as flamegraph.pl or speedscope read directly. With
+deterministic=False only the sampler runs, which costs far less and is the
+better choice on a production host. Optionally tracemalloc records
+allocations and a snapshot is written at the end.
+
+Usage from the scraper:
+
+    profiling.start("profile_out")
+    with profiling.phase("parse_html"):
+        ...
+    profiling.stop()
+
+phase() is a no-op while no profiler is running.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+SUMMARY_LINES = 30  # functions listed per phase in summary.txt
+MEMORY_TOP_LINES = 50  # allocation sites listed in memory_top.txt
+MEMORY_TRACE_FRAMES = 1  # deeper tracebacks make tracemalloc much slower
+IDLE_PHASE = "other"  # label for samples taken outside any phase
+
+
+class PhaseProfiler:
+    """cProfile per phase plus a sampling profiler and optional tracemalloc."""
+
+    def __init__(self, out_dir, deterministic=True,
+                 sample_interval=SAMPLE_INTERVAL, trace_memory=False):
+        self.out_dir = out_dir
+        self.deterministic = deterministic
+        self.sample_interval = sample_interval
+        self.trace_memory = trace_memory
+        self.profiles = {}
+        self.phase_times = Counter()
+        self.stack = []  # active phase names, innermost last
+        self.samples = Counter()
+        self._thread_id = threading.get_ident()
+        self._stopping = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        if self.trace_memory:
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        self._sampler.start()
+
+    @contextmanager
+    def phase(self, name):
+        """Profile the enclosed block as phase ``name``.
+
+        Only one cProfile profiler can be active per thread, so entering a
+        nested phase pauses the outer one until the inner one exits.
+        """
+        outer = self.profiles.get(self.stack[-1]) if self.stack else None
+        profile = None
+        if self.deterministic:
+            if outer:
+                outer.disable()
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+        self.stack.append(name)
+        started = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            self.phase_times[name] += time.perf_counter() - started
+            self.stack.pop()
+            if outer:
+                outer.enable()
+
+    def stop(self):
+        """Stop sampling and write all reports to out_dir."""
+        self._stopping.set()
+        self._sampler.join()
+
+        summary = io.StringIO()
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            summary.write(f"Traced memory: {current / 2**20:.1f} MiB now, "
+                          f"{peak / 2**20:.1f} MiB peak\n\n")
+        for name, seconds in self.phase_times.most_common():
+            summary.write(f"=== {name}: {seconds:.2f}s ===\n")
+            profile = self.profiles.get(name)
+            if profile:
+                profile.dump_stats(os.path.join(self.out_dir, f"{name}.pstats"))
+                stats = pstats.Stats(profile, stream=summary)
+                stats.sort_stats("cumulative").print_stats(SUMMARY_LINES)
+        with open(os.path.join(self.out_dir, "summary.txt"), "w") as f:
+            f.write(summary.getvalue())
+
+        with open(os.path.join(self.out_dir, "stacks.collapsed"), "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        if self.trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snapshot.dump(os.path.join(self.out_dir, "memory.snapshot"))
+            with open(os.path.join(self.out_dir, "memory_top.txt"), "w") as f:
+                for stat in snapshot.statistics("lineno")[:MEMORY_TOP_LINES]:
+                    f.write(f"{stat}\n")
+
+    def _sample(self):
+        while not self._stopping.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            label = self.stack[-1] if self.stack else IDLE_PHASE
+            names.append(label)
+            self.samples[";".join(reversed(names))] += 1
+
+
+_active = None
+
+
+def start(out_dir, deterministic=True, trace_memory=False):
+    """Start profiling the calling thread, writing reports to out_dir."""
+    global _active
+    _active = PhaseProfiler(out_dir, deterministic=deterministic,
+                            trace_memory=trace_memory)
+    _active.start()
+    return _active
+
+
+def stop():
+    """Stop the running profiler (if any) and write its reports."""
+    global _active
+    if _active is not None:
+        _active.stop()
+        _active = None
+
+
+def phase(name):
+    """Context manager marking a profiled phase; no-op when not profiling."""
+    if _active is None:
+        return nullcontext()
+    return _active.phase(name)
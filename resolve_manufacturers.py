@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Canonicalize manufacturer names to stable brand IDs.
+
+Manufacturer strings vary between sellers ("Werner & Pfleiderer" vs
+"WP Bakery", "Goring Kerr" vs "GoringKerr", "Krones AG"). Each raw value
+is resolved against an index of known brands seeded from
+generate_mock_data.MANUFACTURERS / DEFAULT_MANUFACTURERS and
+data/manufacturer_aliases.json:
+
+  1. exact match on a compact key (case, accents, spacing, punctuation,
+     "&"/"und" and legal suffixes such as GmbH or AG removed),
+  2. longest leading-token match ("Krones Neutraubling" -> Krones),
+  3. character trigram index with Dice similarity for misspellings.
+
+Steps 1 and 2 are dict lookups; step 3 only scores brands sharing a
+trigram with the value. Every distinct raw value is resolved once per
+batch. Fuzzy matches and unknown brands seen at least LEARN_MIN_COUNT
+times are remembered in brand_variants.json, so the next run resolves
+them with an exact lookup.
+
+Usage:
+    python resolve_manufacturers.py machines.csv -o machines_brands.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from generate_mock_data import DEFAULT_MANUFACTURERS, MANUFACTURERS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ALIASES_FILE = os.path.join(DATA_DIR, "manufacturer_aliases.json")
+VARIANTS_FILE = "brand_variants.json"
+
+FUZZY_THRESHOLD = 0.75  # minimum trigram Dice similarity
+LEARN_MIN_COUNT = 3  # occurrences before an unknown brand becomes canonical
+
+BRAND_FIELDS = ["brand_id", "brand"]
+
+_LEGAL_SUFFIXES = {
+    "gmbh", "ag", "kg", "co", "mbh", "ltd", "limited", "inc", "bv", "nv",
+    "sa", "sas", "sarl", "spa", "srl", "as", "ab", "oy", "sro", "spzoo",
+    "llc", "corp", "group", "gruppe", "international",
+}
+_CONNECTORS = {"&", "+", "und", "and", "u"}
+
+
+def tokenize(name):
+    """Lowercase ASCII tokens without connectors or legal suffixes."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("&", " & ").replace("+", " + ")
+    tokens = [re.sub(r"[^a-z0-9&+]", "", t) for t in re.split(r"[\s,/\-.()]+", text)]
+    tokens = [t for t in tokens if t and t not in _CONNECTORS]
+    while len(tokens) > 1 and tokens[-1] in _LEGAL_SUFFIXES:
+        tokens.pop()
+    return tokens
+
+
+def compact_key(name):
+    """Key used for exact matching: 'Goring-Kerr GmbH' -> 'goringkerr'."""
+    return "".join(tokenize(name))
+
+
+def brand_id(name):
+    """Stable slug ID for a canonical brand name."""
+    return "-".join(tokenize(name))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class BrandIndex:
+    """Compact-key dict plus trigram inverted index over known brands."""
+
+    def __init__(self):
+        self.keys = {}  # compact key -> canonical name
+        self.grams = defaultdict(set)  # trigram -> canonical compact keys
+        self.gram_counts = {}  # canonical compact key -> number of trigrams
+
+    def add_brand(self, canonical, variants=()):
+        key = compact_key(canonical)
+        if not key:
+            return
+        self.keys[key] = canonical
+        if key not in self.gram_counts:
+            grams = trigrams(key)
+            self.gram_counts[key] = len(grams)
+            for gram in grams:
+                self.grams[gram].add(key)
+        for variant in variants:
+            self.add_variant(variant, canonical)
+
+    def add_variant(self, variant, canonical):
+        key = compact_key(variant)
+        if key:
+            self.keys[key] = canonical
+
+    def resolve(self, raw):
+        """Return (canonical name, method) or (None, "") if unknown."""
+        tokens = tokenize(raw)
+        if not tokens:
+            return None, ""
+        key = "".join(tokens)
+        if key in self.keys:
+            return self.keys[key], "exact"
+
+        # Longest run of leading tokens that names a known brand
+        for end in range(len(tokens) - 1, 0, -1):
+            prefix = "".join(tokens[:end])
+            if prefix in self.keys:
+                return self.keys[prefix], "prefix"
+
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] += 1
+        best, best_score = None, 0.0
+        for candidate, overlap in shared.items():
+            score = 2 * overlap / (len(grams) + self.gram_counts[candidate])
+            if score > best_score:
+                best, best_score = candidate, score
+        if best and best_score >= FUZZY_THRESHOLD:
+            return self.keys[best], "fuzzy"
+        return None, ""
+
+
+def build_index(aliases_path=ALIASES_FILE, variants_path=VARIANTS_FILE):
+    """Index seeded from the mock-data brand lists, aliases and learned variants."""
+    index = BrandIndex()
+    seeds = set(DEFAULT_MANUFACTURERS)
+    for names in MANUFACTURERS.values():
+        seeds.update(names)
+    for name in sorted(seeds):
+        index.add_brand(name)
+
+    # Aliases come last so they can fold a seed into another brand
+    with open(aliases_path, encoding="utf-8") as f:
+        for canonical, variants in json.load(f).items():
+            index.add_brand(canonical, variants)
+
+    if variants_path and os.path.exists(variants_path):
+        with open(variants_path, encoding="utf-8") as f:
+            learned = json.load(f)
+        for canonical in learned.get("brands", []):
+            index.add_brand(canonical)
+        for variant, canonical in learned.get("variants", {}).items():
+            index.add_variant(variant, canonical)
+    return index
+
+
+def resolve_batch(index, raw_values):
+    """Resolve a batch of raw manufacturer strings.
+
+    Each distinct value is resolved once. Returns ({raw: canonical or None},
+    learned) where learned holds new brands and fuzzy-matched variants.
+    """
+    counts = Counter(v.strip() for v in raw_values if v and v.strip())
+    resolved = {}
+    learned = {"brands": [], "variants": {}}
+    unknown = Counter()
+
+    for raw, count in counts.most_common():
+        canonical, method = index.resolve(raw)
+        if canonical is None:
+            unknown[compact_key(raw)] += count
+        elif method == "fuzzy":
+            learned["variants"][raw] = canonical
+            index.add_variant(raw, canonical)
+        resolved[raw] = canonical
+
+    # Frequent unknowns become brands under their most common spelling;
+    # most_common() order means the first raw value per key is that spelling
+    for raw, _ in counts.most_common():
+        if resolved[raw] is not None:
+            continue
+        key = compact_key(raw)
+        if key in index.keys:
+            resolved[raw] = index.keys[key]
+        elif unknown[key] >= LEARN_MIN_COUNT:
+            index.add_brand(raw)
+            learned["brands"].append(raw)
+            resolved[raw] = raw
+    return resolved, learned
+
+
+def save_learned(learned, variants_path=VARIANTS_FILE):
+    """Merge newly learned brands and variants into the variants file."""
+    stored = {"brands": [], "variants": {}}
+    if os.path.exists(variants_path):
+        with open(variants_path, encoding="utf-8") as f:
+            stored = json.load(f)
+    stored["brands"] = sorted(set(stored["brands"]) | set(learned["brands"]))
+    stored["variants"].update(learned["variants"])
+    with open(variants_path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def resolve_csv(input_path, output_path, index, learn=True):
+    """Copy a listings CSV, adding brand_id and brand columns."""
+    with open(input_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+
+    resolved, learned = resolve_batch(index, (r.get("manufacturer", "") for r in rows))
+    if learn:
+        save_learned(learned)
+
+    fieldnames += [f for f in BRAND_FIELDS if f not in fieldnames]
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            canonical = resolved.get((row.get("manufacturer") or "").strip())
+            row["brand"] = canonical or ""
+            row["brand_id"] = brand_id(canonical) if canonical else ""
+            writer.writerow(row)
+    return len(rows), sum(1 for v in resolved.values() if v is None), learned
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resolve manufacturer names to canonical brand IDs"
+    )
+    parser.add_argument("csv", help="Listing CSV file")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    parser.add_argument(
+        "--no-learn", action="store_true",
+        help=f"Do not update {VARIANTS_FILE} with new brands and variants",
+    )
+    args = parser.parse_args()
+
+    index = build_index()
+    rows, unresolved, learned = resolve_csv(
+        args.csv, args.output, index, learn=not args.no_learn,
+    )
+    print(f"Resolved {rows} listings -> {args.output}")
+    print(f"  Unresolved values: {unresolved}")
+    print(f"  Learned: {len(learned['brands'])} brands, "
+          f"{len(learned['variants'])} variants")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,23 +12,38 @@ Legal compliance:
   - Only collects factual, non-copyrighted data (specs, prices, metadata)
   - Does NOT scrape seller descriptions (copyrighted content)
   - Rate-limits all requests with jitter to avoid server strain
+  - Backs off per host on errors and 429/503, honoring Retry-After
   - Attributes source for every listing
 """
 
 import argparse
 import csv
+import gzip
+import heapq
+import html
 import json
 import os
 import re
+import signal
 import sys
+import threading
 import time
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 from tqdm import tqdm
 
+import listing_ids
+import profiling
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -106,17 +121,94 @@ CSV_FIELDS = [
     "scraped_at",
 ]
 
-PROGRESS_FILE = "scraper_progress.json"
+PROGRESS_FILE = "scraper_progress.ids"  # listing_ids.ListingIdSet
+LEGACY_PROGRESS_FILE = "scraper_progress.json"  # imported once if present
+SITEMAP_STATE_FILE = "sitemap_state.json"  # lastmod per listing, kept across runs
 OUTPUT_FILE = "machines.csv"
 MAX_RETRIES = 3
 LISTINGS_PER_PAGE = 12
 DEFAULT_CRAWL_DELAY = 5  # seconds, from robots.txt
 
+# Retry classes: transient statuses are retried, everything else is final
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}  # server asked us to slow down
+MAX_RETRY_AFTER = 600  # cap on honored Retry-After, in seconds
+
+# Per-host AIMD rate control (delay grows multiplicatively on trouble,
+# shrinks additively back toward the robots.txt crawl delay when healthy)
+MAX_CRAWL_DELAY = 120  # seconds
+DELAY_BACKOFF_FACTOR = 2.0
+DELAY_RECOVERY_STEP = 0.5  # seconds removed per healthy response
+SLOW_RESPONSE_SECONDS = 10  # latency above this counts as a warning sign
+LATENCY_SMOOTHING = 0.3  # EWMA weight of the newest latency sample
+
+# Circuit breaker: stop hitting a host that keeps failing
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before opening
+BREAKER_COOLDOWN = 300  # seconds before a single probe request is allowed
+
+# Spec labels parse_detail_page looks up — English first, then German
+SPEC_LABELS = {
+    "machine_type": ("Machine type", "Maschinenart"),
+    "manufacturer": ("Manufacturer", "Hersteller"),
+    "model": ("Model", "Modell"),
+    "year": ("Year of manufacture", "Year built", "Year of construction",
+             "Baujahr"),
+    "condition": ("Condition", "Zustand"),
+    "dimensions": ("Dimensions", "Abmessungen", "Maße"),
+    "length": ("Length", "Länge"),
+    "width": ("Width", "Breite"),
+    "height": ("Height", "Höhe"),
+    "weight": ("Weight", "Gewicht"),
+    "voltage": ("Input voltage", "Spannung"),
+    "power": ("Power", "Leistung"),
+    "current": ("Input current", "Stromstärke"),
+    "frequency": ("Input frequency", "Frequenz"),
+    "price": ("Price", "Preis"),
+    "location": ("Location", "Standort", "Machine location",
+                 "Maschinenstandort"),
+    "country": ("Country", "Land"),
+    "seller": ("Dealer", "Seller", "Händler", "Anbieter"),
+}
+VERIFIED_RE = re.compile(r"Verified|Geprüfter|trusted", re.IGNORECASE)
+# Seller box holding the verified badge (the whole page is searched if none)
+SELLER_CLASS_RE = re.compile(r"seller|dealer|vendor|anbieter|h(?:ä|ae)ndler",
+                             re.IGNORECASE)
+
+# Streaming detail parsing (--stream): read the body in chunks and stop once
+# the spec list and the seller box have closed and every meta tag in
+# STREAM_REQUIRED_META was seen
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_REQUIRED_META = ["og:image"]
+
+# Sitemap discovery (--discovery sitemap)
+SITEMAP_MAX_DEPTH = 3  # sitemap index nesting we follow
+SITEMAP_MAX_PROBES = 200  # uncategorized new listings fetched per run
+
+# Crawl budget (--budget): requests per run are shared out by learned yield
+CATEGORY_STATS_FILE = "category_stats.json"  # per-category yield history
+MIN_CATEGORY_REQUESTS = 2  # floor: one category page and one detail page
+PRIOR_YIELD = 0.5  # assumed fresh listings per request for unseen categories
+YIELD_SMOOTHING = 0.3  # EWMA weight of the latest run
+BUDGET_DECAY = 0.8  # value of each further page's worth of requests
+
+# Daemon mode (--daemon): each category is re-crawled on its own interval
+DAEMON_STATUS_FILE = "scraper_status.json"  # rewritten after every job
+DAEMON_CONTROL_FILE = "scraper_control.txt"  # one request per line, see run_daemon
+DEFAULT_REFRESH_INTERVAL = 6 * 3600  # seconds
+CATEGORY_REFRESH_INTERVALS = {
+    "Meat processing machines": 2 * 3600,
+    "Packaging machinery": 2 * 3600,
+}
+DAEMON_POLL_INTERVAL = 5  # seconds between control file checks when idle
+DAEMON_RETRY_DELAY = 15 * 60  # seconds before retrying a category whose job failed
+ROBOTS_TTL = 24 * 3600  # re-read robots.txt this often in long-running mode
+
 # ---------------------------------------------------------------------------
 # robots.txt compliance
 # ---------------------------------------------------------------------------
 
 _robots_cache = {}
+_robots_fetched = {}
 
 
 def check_robots(url):
@@ -133,23 +225,33 @@ def check_robots(url):
             # If we can't read robots.txt, be conservative and allow
             return True
         _robots_cache[robots_url] = rp
+        _robots_fetched[robots_url] = time.monotonic()
 
     rp = _robots_cache[robots_url]
     return rp.can_fetch(USER_AGENT, url)
 
 
-def get_crawl_delay():
+def get_crawl_delay(base_url=BASE_URL, default=DEFAULT_CRAWL_DELAY):
     """Get the crawl delay from robots.txt, or use default."""
-    robots_url = f"{BASE_URL}/robots.txt"
+    robots_url = f"{base_url}/robots.txt"
     if robots_url not in _robots_cache:
-        check_robots(BASE_URL)  # populate cache
+        check_robots(base_url)  # populate cache
 
     rp = _robots_cache.get(robots_url)
     if rp:
         delay = rp.crawl_delay(USER_AGENT)
         if delay:
             return delay
-    return DEFAULT_CRAWL_DELAY
+    return default
+
+
+def expire_robots_cache(max_age=ROBOTS_TTL):
+    """Drop robots.txt entries older than max_age so they are re-read."""
+    now = time.monotonic()
+    for robots_url, fetched in list(_robots_fetched.items()):
+        if now - fetched > max_age:
+            _robots_cache.pop(robots_url, None)
+            del _robots_fetched[robots_url]
 
 
 # ---------------------------------------------------------------------------
@@ -169,28 +271,166 @@ def get_session():
     return session
 
 
-def fetch_page(session, url, crawl_delay, retries=MAX_RETRIES):
-    """Fetch a page respecting robots.txt and crawl delay."""
+class HostRateController:
+    """AIMD delay controller and circuit breaker for a single host.
+
+    The delay never drops below the robots.txt crawl delay. Throttling
+    responses, errors and slow responses double it (up to MAX_CRAWL_DELAY);
+    each healthy response takes DELAY_RECOVERY_STEP off again. Threads
+    crawling the same host share one controller; the lock keeps their
+    requests at least one delay apart.
+    """
+
+    def __init__(self, min_delay):
+        self.lock = threading.Lock()
+        self.min_delay = min_delay
+        self.delay = min_delay
+        self.latency = None  # EWMA of response time, seconds
+        self.failures = 0  # consecutive failures
+        self.open_until = 0.0  # circuit breaker deadline (monotonic)
+        self.not_before = 0.0  # earliest next request (monotonic)
+
+    def is_open(self):
+        """True while the breaker refuses requests to this host."""
+        return time.monotonic() < self.open_until
+
+    def wait(self):
+        """Reserve the next request slot for this host and sleep until it."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.not_before)
+            self.not_before = slot + self.delay
+        time.sleep(slot - now)
+
+    def record_success(self, latency):
+        """Healthy response: recover toward the crawl delay unless slow."""
+        with self.lock:
+            self._record_success(latency)
+
+    def record_failure(self, retry_after=None):
+        """Failed or throttled response: back off, maybe open the breaker."""
+        with self.lock:
+            self._record_failure(retry_after)
+
+    def _record_success(self, latency):
+        self.failures = 0
+        self.open_until = 0.0
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+        if self.latency > SLOW_RESPONSE_SECONDS:
+            self._back_off()
+        else:
+            self.delay = max(self.min_delay, self.delay - DELAY_RECOVERY_STEP)
+
+    def _record_failure(self, retry_after):
+        self.failures += 1
+        self._back_off()
+        if retry_after:
+            self.not_before = max(self.not_before,
+                                  time.monotonic() + retry_after)
+        if self.failures >= BREAKER_FAILURE_THRESHOLD:
+            # After the cooldown one probe gets through; another failure
+            # re-opens the breaker immediately because the count is kept.
+            self.open_until = time.monotonic() + BREAKER_COOLDOWN
+
+    def _back_off(self):
+        self.delay = min(MAX_CRAWL_DELAY, self.delay * DELAY_BACKOFF_FACTOR)
+
+
+_rate_controllers = {}
+_rate_controllers_lock = threading.Lock()
+
+
+def get_rate_controller(url, crawl_delay):
+    """Return the shared rate controller for the URL's host."""
+    host = urlparse(url).netloc
+    with _rate_controllers_lock:
+        controller = _rate_controllers.get(host)
+        if controller is None:
+            controller = HostRateController(crawl_delay)
+            _rate_controllers[host] = controller
+        else:
+            controller.min_delay = crawl_delay
+    return controller
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = int(value)
+    else:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+
+def fetch_page(session, url, crawl_delay, retries=MAX_RETRIES, stream=False,
+               usage=None):
+    """Fetch a page respecting robots.txt, crawl delay and server pushback.
+
+    Only transient failures (timeouts, connection errors and
+    RETRYABLE_STATUSES) are retried; 429/503 honor Retry-After. Other
+    4xx responses such as 404 are returned as None straight away.
+    With stream=True the body is left unread for stream_detail_soup().
+    If a usage dict is passed, usage["requests"] counts the requests
+    actually sent (retries included, skips for an open circuit not).
+    """
     # Check robots.txt
     if not check_robots(url):
         print(f"\n  Blocked by robots.txt: {url}")
         return None
 
+    controller = get_rate_controller(url, crawl_delay)
+
     for attempt in range(retries):
+        if controller.is_open():
+            print(f"\n  Circuit open for {urlparse(url).netloc}, skipping: {url}")
+            return None
+
+        # Respect crawl delay (and any Retry-After we were given)
+        controller.wait()
+        started = time.monotonic()
+        if usage is not None:
+            usage["requests"] = usage.get("requests", 0) + 1
         try:
-            # Respect crawl delay
-            time.sleep(crawl_delay)
-            resp = session.get(url, timeout=30)
-            resp.raise_for_status()
-            return resp
+            resp = session.get(url, timeout=30, stream=stream)
         except requests.RequestException as e:
-            if attempt < retries - 1:
-                wait = 2 ** (attempt + 1)
-                print(f"\n  Retry {attempt + 1}/{retries} for {url}: {e}")
-                time.sleep(wait)
-            else:
-                print(f"\n  Failed after {retries} attempts: {url}: {e}")
+            controller.record_failure()
+            error = e
+        else:
+            if resp.ok:
+                controller.record_success(time.monotonic() - started)
+                return resp
+            # Release the pooled connection (a streamed body is unread)
+            resp.close()
+            if resp.status_code not in RETRYABLE_STATUSES:
+                # Permanent for this URL; the host itself is fine
+                controller.record_success(time.monotonic() - started)
+                print(f"\n  HTTP {resp.status_code}, not retrying: {url}")
                 return None
+            retry_after = None
+            if resp.status_code in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            controller.record_failure(retry_after)
+            error = f"HTTP {resp.status_code}"
+            if retry_after:
+                error += f" (Retry-After {retry_after:.0f}s)"
+
+        if attempt < retries - 1:
+            print(f"\n  Retry {attempt + 1}/{retries} for {url}: {error}")
+        else:
+            print(f"\n  Failed after {retries} attempts: {url}: {error}")
+    return None
 
 
 # ---------------------------------------------------------------------------
@@ -219,9 +459,14 @@ def extract_listing_urls(soup):
     return urls
 
 
+_LISTING_ID_RE = re.compile(r"/i-(\d+)")
+
+
 def extract_listing_id(url):
     """Extract the numeric listing ID from a detail URL."""
-    match = re.search(r"/i-(\d+)", url)
+    if "/i-" not in url:  # cheap pre-check before the regex
+        return None
+    match = _LISTING_ID_RE.search(url)
     return match.group(1) if match else None
 
 
@@ -285,7 +530,7 @@ def parse_price(soup):
                     return price, "USD"
 
     # Check spec table
-    price_spec = get_spec_value(soup, "Price", "Preis")
+    price_spec = get_spec_value(soup, *SPEC_LABELS["price"])
     if price_spec:
         for pattern in price_patterns:
             match = re.search(pattern, price_spec)
@@ -324,9 +569,9 @@ def parse_detail_page(soup, url, category):
         tag.decompose()
 
     # Factual specs — try English labels first, then German fallbacks
-    machine_type = get_spec_value(soup, "Machine type", "Maschinenart")
-    data["manufacturer"] = get_spec_value(soup, "Manufacturer", "Hersteller")
-    data["model"] = get_spec_value(soup, "Model", "Modell")
+    machine_type = get_spec_value(soup, *SPEC_LABELS["machine_type"])
+    data["manufacturer"] = get_spec_value(soup, *SPEC_LABELS["manufacturer"])
+    data["model"] = get_spec_value(soup, *SPEC_LABELS["model"])
 
     # Build title from specs rather than relying on h1 (which concatenates child elements)
     title_parts = [p for p in [machine_type, data["manufacturer"], data["model"]] if p]
@@ -342,34 +587,29 @@ def parse_detail_page(soup, url, category):
             if title_el:
                 data["title"] = title_el.get_text(strip=True)
 
-    data["year"] = get_spec_value(soup, "Year of manufacture", "Year built",
-                                  "Year of construction", "Baujahr")
-    data["condition"] = get_spec_value(soup, "Condition", "Zustand")
+    data["year"] = get_spec_value(soup, *SPEC_LABELS["year"])
+    data["condition"] = get_spec_value(soup, *SPEC_LABELS["condition"])
 
     # Dimensions
-    dims = clean_text(get_spec_value(soup, "Dimensions", "Abmessungen", "Maße"))
+    dims = clean_text(get_spec_value(soup, *SPEC_LABELS["dimensions"]))
     if not dims:
-        length = get_spec_value(soup, "Length", "Länge")
-        width = get_spec_value(soup, "Width", "Breite")
-        height = get_spec_value(soup, "Height", "Höhe")
+        length = get_spec_value(soup, *SPEC_LABELS["length"])
+        width = get_spec_value(soup, *SPEC_LABELS["width"])
+        height = get_spec_value(soup, *SPEC_LABELS["height"])
         parts = [clean_text(p) for p in [length, width, height] if clean_text(p)]
         if parts:
             dims = " x ".join(parts)
     data["dimensions"] = dims
 
-    data["weight"] = clean_text(get_spec_value(soup, "Weight", "Gewicht"))
+    data["weight"] = clean_text(get_spec_value(soup, *SPEC_LABELS["weight"]))
 
     # Electrical
     electrical_parts = []
-    for en_label, de_label in [
-        ("Input voltage", "Spannung"),
-        ("Power", "Leistung"),
-        ("Input current", "Stromstärke"),
-        ("Input frequency", "Frequenz"),
-    ]:
-        val = clean_text(get_spec_value(soup, en_label, de_label))
+    for spec in ["voltage", "power", "current", "frequency"]:
+        labels = SPEC_LABELS[spec]
+        val = clean_text(get_spec_value(soup, *labels))
         if val:
-            electrical_parts.append(f"{en_label.replace('Input ', '')}: {val}")
+            electrical_parts.append(f"{labels[0].replace('Input ', '')}: {val}")
     data["electrical"] = "; ".join(electrical_parts)
 
     # Price
@@ -380,11 +620,10 @@ def parse_detail_page(soup, url, category):
         data["currency"] = currency
 
     # Location & country
-    location = get_spec_value(soup, "Location", "Standort", "Machine location",
-                              "Maschinenstandort")
+    location = get_spec_value(soup, *SPEC_LABELS["location"])
     data["location"] = location
 
-    country = get_spec_value(soup, "Country", "Land")
+    country = get_spec_value(soup, *SPEC_LABELS["country"])
     if not country and location:
         parts = [p.strip() for p in location.split(",")]
         if len(parts) > 1:
@@ -393,16 +632,15 @@ def parse_detail_page(soup, url, category):
 
     # Seller info (company name is factual, not copyrighted)
     # Try the "Dealer" / "Seller" spec label first
-    seller_name = get_spec_value(soup, "Dealer", "Seller", "Händler", "Anbieter")
+    seller_name = get_spec_value(soup, *SPEC_LABELS["seller"])
     # Filter out inquiry form text and other noise
     noise_patterns = ["Send inquiry", "Dear Sir", "Note:", "Register",
                       "Log in", "interested in"]
     if seller_name and not any(n in seller_name for n in noise_patterns):
         data["seller_name"] = seller_name[:100]
 
-    verified = soup.find(
-        string=re.compile(r"Verified|Geprüfter|trusted", re.IGNORECASE)
-    )
+    seller_blocks = soup.find_all(class_=SELLER_CLASS_RE) or [soup]
+    verified = any(block.find(string=VERIFIED_RE) for block in seller_blocks)
     data["seller_verified"] = "Yes" if verified else "No"
 
     # Image URL (for reference/attribution; app uses own images)
@@ -419,24 +657,268 @@ def parse_detail_page(soup, url, category):
     return data
 
 
+# ---------------------------------------------------------------------------
+# Streaming detail parsing
+# ---------------------------------------------------------------------------
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+              "link", "meta", "source", "track", "wbr"}
+_SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+# Label elements get_spec_value reads, the value sibling each needs
+# (None: any next element with text) and the list element holding the
+# pairs. Label/value pairs (often filter forms) never end the stream.
+_LABEL_TAGS = {"dt": ("dd", "dl"), "th": ("td", "table"), "label": (None, None)}
+
+
+class _PrunedPageBuilder:
+    """lxml parser target that rebuilds a page without script/style content.
+
+    Also watches the page structure parse_detail_page reads from. A spec
+    pair is a dt or th element whose text contains a SPEC_LABELS label,
+    followed by its dd or td. ``done`` flips once the dl or table holding
+    the first pair has closed, a seller box (class matching
+    SELLER_CLASS_RE) has closed and the STREAM_REQUIRED_META tags were
+    seen. Pages without such a spec list or seller box are read in full.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.stack = []
+        self.skipping = 0  # depth inside script/style
+        self.labels = [label.lower() for labels in SPEC_LABELS.values()
+                       for label in labels]
+        self.meta = set(STREAM_REQUIRED_META)
+        self.label = None  # [depth, tag, text] of an open label element
+        self.pending = None  # (depth, label tag) awaiting a value
+        self.value = None  # [depth, label tag] of a value element
+        self.container_depth = None  # depth of the list holding the specs
+        self.specs_closed = False
+        self.seller_depths = []  # depths of open seller boxes
+        self.seller_closed = False
+        self.done = False
+
+    def start(self, tag, attrib):
+        if self.skipping or tag in _SKIPPED_TAGS:
+            self.skipping += tag not in _VOID_TAGS
+            return
+        attrs = "".join(f' {k}="{html.escape(v)}"' for k, v in attrib.items())
+        self.parts.append(f"<{tag}{attrs}>")
+        if tag in _VOID_TAGS:
+            if tag == "meta":
+                self.meta.discard(attrib.get("property") or attrib.get("name"))
+            return
+        if self.pending and len(self.stack) == self.pending[0]:
+            label_tag = self.pending[1]
+            if _LABEL_TAGS[label_tag][0] in (None, tag):
+                self.value = [len(self.stack) + 1, label_tag]
+                self.pending = None
+        self.stack.append(tag)
+        if self.label is None and tag in _LABEL_TAGS:
+            self.label = [len(self.stack), tag, ""]
+        if SELLER_CLASS_RE.search(attrib.get("class", "")):
+            self.seller_depths.append(len(self.stack))
+
+    def end(self, tag):
+        if tag in _VOID_TAGS:
+            return
+        if self.skipping:
+            self.skipping -= 1
+            return
+        self.parts.append(f"</{tag}>")
+        depth = len(self.stack)
+        if self.stack:
+            self.stack.pop()
+
+        if self.value and self.value[0] == depth:
+            label_tag = self.value[1]
+            self.value = None
+            if label_tag != "label" and self.container_depth is None:
+                self.container_depth = self._container_depth(label_tag)
+        if self.label and self.label[0] == depth:
+            _, label_tag, text = self.label
+            self.label = None
+            text = text.strip().lower()
+            if any(label in text for label in self.labels):
+                self.pending = (len(self.stack), label_tag)
+        if self.pending and len(self.stack) < self.pending[0]:
+            self.pending = None  # parent closed without a value sibling
+        if self.container_depth and len(self.stack) < self.container_depth:
+            self.specs_closed = True
+        if self.seller_depths and self.seller_depths[-1] == depth:
+            self.seller_depths.pop()
+            self.seller_closed = True
+        if self.specs_closed and self.seller_closed and not self.meta:
+            self.done = True
+
+    def data(self, data):
+        if self.skipping:
+            return
+        self.parts.append(html.escape(data, quote=False))
+        if self.label:
+            self.label[2] += data
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return "".join(self.parts)
+
+    def _container_depth(self, label_tag):
+        """Depth of the dl/table around the pair just read (or its parent)."""
+        container = _LABEL_TAGS[label_tag][1]
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i] == container:
+                return i + 1
+        return len(self.stack)
+
+
+def stream_detail_soup(resp, chunk_size=STREAM_CHUNK_SIZE):
+    """Build a soup from a streamed response, reading only what is needed.
+
+    Chunks are fed to an incremental lxml parser that drops script/style
+    content as it goes. Reading stops once the spec list and seller box
+    have closed and the required meta tags were seen (see
+    _PrunedPageBuilder); pages without them are read in full. Returns
+    None if the body breaks off or cannot be parsed.
+    """
+    builder = _PrunedPageBuilder()
+    # Only trust an explicit charset; otherwise let libxml2 sniff <meta>
+    content_type = resp.headers.get("Content-Type", "")
+    encoding = resp.encoding if "charset" in content_type.lower() else None
+    parser = etree.HTMLParser(target=builder, encoding=encoding)
+    try:
+        for chunk in resp.iter_content(chunk_size):
+            parser.feed(chunk)
+            if builder.done:
+                break
+        root = parser.close()
+    except (etree.XMLSyntaxError, requests.RequestException) as e:
+        print(f"\n  Could not read {resp.url}: {e}")
+        return None
+    finally:
+        # Closing an unfinished body drops the connection instead of
+        # draining it; that is the point of stopping early.
+        resp.close()
+    return BeautifulSoup(root, "lxml")
+
+
+# ---------------------------------------------------------------------------
+# Source adapters
+# ---------------------------------------------------------------------------
+
+DEFAULT_SOURCE = "machineseeker"
+
+
+class SourceAdapter(ABC):
+    """One marketplace: where its listings are and how to read them.
+
+    Subclasses set the class attributes and implement the four methods.
+    Everything else (robots.txt, rate control, retries, the session's
+    connection pool, progress and output) is the shared crawl engine.
+    """
+
+    name = ""  # --source key, prefix for progress IDs and stats
+    label = ""  # value of the "source" column
+    base_url = ""
+    categories = {}  # {category name: info handed to category_url}
+    listings_per_page = LISTINGS_PER_PAGE
+    default_crawl_delay = DEFAULT_CRAWL_DELAY
+
+    @abstractmethod
+    def category_url(self, cat_info, page=1):
+        """URL of one page of a category listing."""
+
+    @abstractmethod
+    def extract_listing_urls(self, soup):
+        """Detail page URLs found on a category page."""
+
+    @abstractmethod
+    def extract_listing_id(self, url):
+        """The source's listing ID for a detail URL, or None."""
+
+    @abstractmethod
+    def parse_detail(self, soup, url, category):
+        """A CSV_FIELDS row for a detail page."""
+
+    def crawl_delay(self):
+        """Crawl-delay from the source's robots.txt, or its default."""
+        return get_crawl_delay(self.base_url, self.default_crawl_delay)
+
+    def key(self, value):
+        """Namespace a listing ID or stats key by source.
+
+        Keys of the default source stay unprefixed so existing progress
+        and stats files keep working.
+        """
+        if value is None or self.name == DEFAULT_SOURCE:
+            return value
+        return f"{self.name}:{value}"
+
+
+class MachineseekerAdapter(SourceAdapter):
+    """machineseeker.com food processing categories."""
+
+    name = "machineseeker"
+    label = "Machineseeker"
+    base_url = BASE_URL
+    categories = SUBCATEGORIES
+
+    def category_url(self, cat_info, page=1):
+        return build_category_url(cat_info["slug"], cat_info["id"], page)
+
+    def extract_listing_urls(self, soup):
+        return extract_listing_urls(soup)
+
+    def extract_listing_id(self, url):
+        return extract_listing_id(url)
+
+    def parse_detail(self, soup, url, category):
+        return parse_detail_page(soup, url, category)
+
+
+# Register new marketplaces here; --source picks from these keys
+SOURCES = {adapter.name: adapter for adapter in [MachineseekerAdapter()]}
+
+
 # ---------------------------------------------------------------------------
 # Progress tracking
 # ---------------------------------------------------------------------------
 
 
 def load_progress():
-    """Load set of already-scraped listing IDs."""
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, "r") as f:
+    """Open the set of already-scraped listing IDs (memory-mapped)."""
+    scraped_ids = listing_ids.ListingIdSet(PROGRESS_FILE)
+    if os.path.exists(LEGACY_PROGRESS_FILE):
+        with open(LEGACY_PROGRESS_FILE, "r") as f:
             data = json.load(f)
-            return set(data.get("scraped_ids", []))
-    return set()
+        for lid in data.get("scraped_ids", []):
+            scraped_ids.add(lid)
+        scraped_ids.compact()
+        os.remove(LEGACY_PROGRESS_FILE)
+    return scraped_ids
+
+
+def clear_progress():
+    """Delete the progress files."""
+    listing_ids.remove(PROGRESS_FILE)
+    if os.path.exists(LEGACY_PROGRESS_FILE):
+        os.remove(LEGACY_PROGRESS_FILE)
+
+
+# Several sources may crawl in parallel threads and share these stores
+_store_lock = threading.RLock()
 
 
 def save_progress(scraped_ids):
     """Persist scraped IDs to disk for resume."""
-    with open(PROGRESS_FILE, "w") as f:
-        json.dump({"scraped_ids": sorted(scraped_ids)}, f)
+    with _store_lock:
+        scraped_ids.save()
+
+
+def mark_scraped(scraped_ids, key):
+    """Record a scraped listing key."""
+    with _store_lock:
+        scraped_ids.add(key)
 
 
 # ---------------------------------------------------------------------------
@@ -459,38 +941,348 @@ def append_to_csv(filepath, row):
         writer.writerow(row)
 
 
+_table_writer = None  # export_parquet.ListingTableWriter, set by --parquet
+
+
+def write_row(filepath, row):
+    """Append one row to the CSV and, if enabled, the columnar output."""
+    with _store_lock:
+        append_to_csv(filepath, row)
+        if _table_writer is not None:
+            _table_writer.write(row)
+
+
+# ---------------------------------------------------------------------------
+# Sitemap discovery
+# ---------------------------------------------------------------------------
+
+_CATEGORY_BY_ID = {info["id"]: name for name, info in SUBCATEGORIES.items()}
+
+
+def load_sitemap_state():
+    """Load the sitemap state.
+
+    "listings" maps a listing ID to {"lastmod", "category", "scraped"};
+    "sitemaps" maps a child sitemap URL to {"lastmod", "cats"}, the
+    categories whose listings were all fetched at that lastmod.
+    """
+    if os.path.exists(SITEMAP_STATE_FILE):
+        with open(SITEMAP_STATE_FILE, "r") as f:
+            data = json.load(f)
+            return {
+                "listings": data.get("listings", {}),
+                "sitemaps": data.get("sitemaps", {}),
+            }
+    return {"listings": {}, "sitemaps": {}}
+
+
+def save_sitemap_state(state):
+    """Persist sitemap state to disk."""
+    with open(SITEMAP_STATE_FILE, "w") as f:
+        json.dump(state, f)
+
+
+def get_sitemap_urls():
+    """Return the Sitemap: entries from robots.txt."""
+    robots_url = f"{BASE_URL}/robots.txt"
+    if robots_url not in _robots_cache:
+        check_robots(BASE_URL)  # populate cache
+
+    rp = _robots_cache.get(robots_url)
+    return (rp.site_maps() if rp else None) or []
+
+
+def parse_lastmod(value):
+    """Parse a W3C datetime lastmod into an aware UTC datetime."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc)
+
+
+def is_newer(lastmod, stored):
+    """True if lastmod is later than the stored lastmod string.
+
+    A missing stored lastmod counts as stale once the sitemap has one.
+    """
+    new, old = parse_lastmod(lastmod), parse_lastmod(stored)
+    if new is None:
+        return False
+    return old is None or new > old
+
+
+_CATEGORY_ID_RE = re.compile(r"\bci-(\d+)")
+
+
+def category_hint(url, cats, by_slug=False):
+    """Category a sitemap or listing URL names, before fetching anything.
+
+    Returns the category name if it is one of cats, "" if the URL belongs
+    to another category and None if it does not name one. Listing URLs
+    only carry manufacturer/model slugs, so slugs are checked for
+    sitemap URLs (by_slug=True) only.
+    """
+    match = _CATEGORY_ID_RE.search(url)
+    if match:
+        name = _CATEGORY_BY_ID.get(int(match.group(1)))
+        return name if name in cats else ""
+    if by_slug:
+        path = urlparse(url).path.lower()
+        for name, info in SUBCATEGORIES.items():
+            if info["slug"].lower() in path:
+                return name if name in cats else ""
+    return None
+
+
+def iter_sitemap(session, url, crawl_delay):
+    """Stream one sitemap, yielding (kind, loc, lastmod) per entry.
+
+    kind is "url" for a urlset entry and "sitemap" for an index entry.
+    Gzipped sitemaps are decompressed on the fly and elements are cleared
+    as soon as they are read, so memory stays flat for large files.
+    """
+    resp = fetch_page(session, url, crawl_delay, stream=True)
+    if resp is None:
+        return
+    try:
+        resp.raw.decode_content = True  # undo Content-Encoding: gzip
+        body = resp.raw
+        content_type = resp.headers.get("Content-Type", "")
+        if urlparse(url).path.endswith(".gz") or "gzip" in content_type:
+            body = gzip.GzipFile(fileobj=body)
+        entry = {}
+        for _, elem in ET.iterparse(body, events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag in ("loc", "lastmod"):
+                entry[tag] = (elem.text or "").strip()
+            elif tag in ("url", "sitemap"):
+                if entry.get("loc"):
+                    yield tag, entry["loc"], entry.get("lastmod", "")
+                entry = {}
+                elem.clear()
+    except (ET.ParseError, OSError, EOFError, requests.RequestException) as e:
+        print(f"\n  Could not read sitemap {url}: {e}")
+    finally:
+        resp.close()
+
+
+def discover_from_sitemaps(session, crawl_delay, state, cats, scraped_ids):
+    """Find in-category listings that are new or changed since the last run.
+
+    Nested sitemap indexes are followed up to SITEMAP_MAX_DEPTH. A child
+    sitemap is skipped when it names a category outside cats, or when its
+    lastmod has not moved since a run that covered all of the categories
+    this run needs from it. Nothing is fetched for listings that cannot
+    be in cats: URLs naming another category, and listings stored under
+    another category. IDs already in scraped_ids that are new to the
+    sitemap state are recorded as they are, without a fetch.
+
+    A listing is up to date when its lastmod has not moved and it was
+    scraped, or found to be outside the food categories. One seen by a
+    run for other categories and never scraped is scheduled again.
+
+    Returns ([(detail_url, lastmod, category)], marks). category is None
+    where it is still unknown (see scrape_sitemaps). marks maps sitemap
+    URLs to (lastmod, categories covered) and should only be stored with
+    store_sitemap_marks once all listings were fetched.
+    """
+    listings = state["listings"]
+    sitemaps = state["sitemaps"]
+    marks = {}
+    pending = [(url, "", 0, None) for url in get_sitemap_urls()]
+    seen = set()
+    found = {}
+
+    while pending:
+        sitemap_url, sitemap_lastmod, depth, sitemap_cat = pending.pop()
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+
+        for kind, loc, lastmod in iter_sitemap(session, sitemap_url, crawl_delay):
+            if kind == "sitemap":
+                if depth >= SITEMAP_MAX_DEPTH:
+                    continue
+                hint = category_hint(loc, cats, by_slug=True)
+                if hint == "":
+                    continue  # another category's sitemap
+                child_cat = hint or sitemap_cat
+                stored = sitemaps.get(loc)
+                if isinstance(stored, dict) and lastmod \
+                        and not is_newer(lastmod, stored["lastmod"]) \
+                        and _covered(child_cat, cats) <= set(stored["cats"]):
+                    continue
+                pending.append((loc, lastmod, depth + 1, child_cat))
+                continue
+
+            lid = extract_listing_id(loc)
+            if not lid:
+                continue
+            hint = category_hint(loc, cats)
+            category = sitemap_cat if hint is None else hint
+            known = listings.get(lid)
+            if known is None and lid in scraped_ids:
+                # Scraped through category discovery, so it is one of ours
+                listings[lid] = {"lastmod": lastmod, "category": category,
+                                 "scraped": True}
+                continue
+            if known is not None:
+                done = (known.get("scraped") or lid in scraped_ids
+                        or known.get("category") == "")
+                if done and not is_newer(lastmod, known.get("lastmod")):
+                    continue
+                if category is None:
+                    category = known.get("category")
+            if category == "" or (category is not None and category not in cats):
+                continue
+            parsed = urlparse(loc)
+            found[lid] = (f"{parsed.scheme}://{parsed.netloc}{parsed.path}",
+                          lastmod, category)
+
+        if sitemap_lastmod:
+            marks[sitemap_url] = (sitemap_lastmod, _covered(sitemap_cat, cats))
+
+    # Listings with a known category first, breadcrumb probes last
+    targets = sorted(found.values(), key=lambda target: target[2] is None)
+    return targets, marks
+
+
+def _covered(sitemap_cat, cats):
+    """Categories a run over cats needs from a sitemap."""
+    return {sitemap_cat} if sitemap_cat else set(cats)
+
+
+def store_sitemap_marks(state, marks):
+    """Record fully fetched sitemaps, keeping categories covered earlier."""
+    sitemaps = state["sitemaps"]
+    for url, (lastmod, covered) in marks.items():
+        stored = sitemaps.get(url)
+        if isinstance(stored, dict) and stored["lastmod"] == lastmod:
+            covered = covered | set(stored["cats"])
+        sitemaps[url] = {"lastmod": lastmod, "cats": sorted(covered)}
+
+
+def detect_category(soup):
+    """Map a detail page's breadcrumb ci- links to a SUBCATEGORIES name."""
+    for link in soup.find_all("a", href=re.compile(r"/ci-\d+")):
+        match = re.search(r"/ci-(\d+)", link["href"])
+        name = _CATEGORY_BY_ID.get(int(match.group(1)))
+        if name:
+            return name
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Scraping
 # ---------------------------------------------------------------------------
 
 
+_record_pages_dir = None  # set by --record-pages
+
+
+def fetch_detail(session, detail_url, crawl_delay, stream=False, usage=None):
+    """Fetch a detail page and return its soup, or None."""
+    with profiling.phase("fetch"):
+        resp = fetch_page(session, detail_url, crawl_delay, stream=stream,
+                          usage=usage)
+    if resp is None:
+        return None
+    # In stream mode download and parsing are interleaved; both count here
+    with profiling.phase("parse_html"):
+        if stream:
+            soup = stream_detail_soup(resp)
+            if soup is None:
+                return None
+            markup = str(soup)
+        else:
+            markup = resp.text
+            soup = BeautifulSoup(markup, "lxml")
+    if _record_pages_dir:
+        lid = extract_listing_id(detail_url) or "unknown"
+        path = os.path.join(_record_pages_dir, f"{lid}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markup)
+    return soup
+
+
+def reparse_pages(page_dir):
+    """Parse recorded detail pages offline, e.g. to profile the parser."""
+    paths = sorted(
+        os.path.join(page_dir, name) for name in os.listdir(page_dir)
+        if name.endswith(".html")
+    )
+    started = time.perf_counter()
+    for path in tqdm(paths, desc="Reparsing"):
+        with profiling.phase("read"):
+            with open(path, "r", encoding="utf-8") as f:
+                markup = f.read()
+        lid = os.path.splitext(os.path.basename(path))[0]
+        with profiling.phase("parse_html"):
+            soup = BeautifulSoup(markup, "lxml")
+        with profiling.phase("extract"):
+            parse_detail_page(soup, f"{BASE_URL}/i-{lid}", "")
+    elapsed = time.perf_counter() - started
+    rate = len(paths) / elapsed if elapsed else 0
+    print(f"Reparsed {len(paths)} pages in {elapsed:.2f}s ({rate:.1f} pages/s)")
+
+
 def scrape_subcategory(session, cat_name, cat_info, scraped_ids,
-                       output_file, crawl_delay, limit=None):
-    """Scrape all listings from one subcategory."""
+                       output_file, crawl_delay, limit=None, stream=False,
+                       budget=None, usage=None, adapter=None):
+    """Scrape all listings from one subcategory.
+
+    With stream=True detail pages are parsed incrementally and downloads
+    stop early (see stream_detail_soup). budget caps the number of
+    requests (category pages plus detail pages, retries included); the
+    number actually sent is stored in usage["requests"] when a usage dict
+    is passed. adapter selects the source (default: machineseeker).
+    """
+    adapter = adapter or SOURCES[DEFAULT_SOURCE]
+    usage = {} if usage is None else usage
+    usage["requests"] = 0
+
+    def listing_key(url):
+        return adapter.key(adapter.extract_listing_id(url))
+
     listing_urls = []
     page = 1
 
     # Phase 1: collect listing URLs from paginated category pages
-    while True:
-        url = build_category_url(cat_info["slug"], cat_info["id"], page)
-        resp = fetch_page(session, url, crawl_delay)
+    while not budget or usage["requests"] < budget:
+        url = adapter.category_url(cat_info, page)
+        with profiling.phase("fetch"):
+            resp = fetch_page(session, url, crawl_delay, usage=usage)
         if resp is None:
             break
 
-        soup = BeautifulSoup(resp.text, "lxml")
-        urls = extract_listing_urls(soup)
+        with profiling.phase("discover"):
+            soup = BeautifulSoup(resp.text, "lxml")
+            urls = adapter.extract_listing_urls(soup)
 
         if not urls:
             break
 
-        new_urls = [u for u in urls if extract_listing_id(u) not in scraped_ids]
+        new_urls = [u for u in urls if listing_key(u) not in scraped_ids]
         listing_urls.extend(new_urls)
 
         if limit and len(listing_urls) >= limit:
             listing_urls = listing_urls[:limit]
             break
 
-        if len(urls) < LISTINGS_PER_PAGE:
+        # Keep the rest of the budget for the detail pages found so far
+        if budget and usage["requests"] + len(listing_urls) >= budget:
+            listing_urls = listing_urls[:budget - usage["requests"]]
+            break
+
+        if len(urls) < adapter.listings_per_page:
             break
 
         page += 1
@@ -501,34 +1293,321 @@ def scrape_subcategory(session, cat_name, cat_info, scraped_ids,
     # Phase 2: visit each detail page
     count = 0
     for detail_url in tqdm(listing_urls, desc=f"  {cat_name[:35]}", leave=False):
-        lid = extract_listing_id(detail_url)
+        lid = listing_key(detail_url)
         if lid in scraped_ids:
             continue
+        if budget and usage["requests"] >= budget:
+            break  # retries used up the rest
 
-        resp = fetch_page(session, detail_url, crawl_delay)
-        if resp is None:
+        soup = fetch_detail(session, detail_url, crawl_delay, stream=stream,
+                            usage=usage)
+        if soup is None:
+            continue
+
+        with profiling.phase("extract"):
+            row = adapter.parse_detail(soup, detail_url, cat_name)
+        with profiling.phase("write"):
+            write_row(output_file, row)
+
+        mark_scraped(scraped_ids, lid)
+        count += 1
+
+        if count % 25 == 0:
+            save_progress(scraped_ids)
+
+    save_progress(scraped_ids)
+    return count
+
+
+def scrape_sitemaps(session, cats, scraped_ids, output_file, crawl_delay,
+                    limit=None, stream=False):
+    """Scrape listings that are new or changed according to the sitemaps.
+
+    Listings whose category is known (from SITEMAP_STATE_FILE, or from a
+    category sitemap) are fetched only when it is one of cats. Other new
+    listings are categorized from their breadcrumb, at most
+    SITEMAP_MAX_PROBES per run; the rest wait for the next run. Listings
+    outside cats are remembered with category "" so they are not fetched
+    again. limit counts scraped (in-category) listings. Refreshed listings
+    are appended again, so the newest scraped_at row wins.
+    """
+    state = load_sitemap_state()
+    listings = state["listings"]
+    targets, marks = discover_from_sitemaps(session, crawl_delay, state, cats,
+                                            scraped_ids)
+    probes = sum(1 for target in targets if target[2] is None)
+    print(f"  Sitemaps: {len(targets)} new or changed listings "
+          f"({probes} of unknown category)")
+
+    count = 0
+    probed = 0
+    complete = True
+    for detail_url, lastmod, category in tqdm(targets, desc="Sitemap listings"):
+        if limit and count >= limit:
+            complete = False
+            break
+        if category is None:
+            if probed >= SITEMAP_MAX_PROBES:
+                complete = False
+                break  # probes are sorted last
+            probed += 1
+
+        lid = extract_listing_id(detail_url)
+        soup = fetch_detail(session, detail_url, crawl_delay, stream=stream)
+        if soup is None:
+            complete = False
+            continue
+
+        category = category or detect_category(soup) or ""
+        listings[lid] = {"lastmod": lastmod, "category": category,
+                         "scraped": category in cats}
+        if category not in cats:
             continue
 
-        soup = BeautifulSoup(resp.text, "lxml")
-        row = parse_detail_page(soup, detail_url, cat_name)
-        append_to_csv(output_file, row)
+        with profiling.phase("extract"):
+            row = parse_detail_page(soup, detail_url, category)
+        with profiling.phase("write"):
+            write_row(output_file, row)
 
-        scraped_ids.add(lid)
+        mark_scraped(scraped_ids, lid)
         count += 1
 
         if count % 25 == 0:
             save_progress(scraped_ids)
+            save_sitemap_state(state)
 
+    # Only skip unchanged child sitemaps next time if nothing was left out
+    if complete:
+        store_sitemap_marks(state, marks)
     save_progress(scraped_ids)
+    save_sitemap_state(state)
     return count
 
 
+# ---------------------------------------------------------------------------
+# Crawl budget
+# ---------------------------------------------------------------------------
+
+
+def load_category_stats():
+    """Load per-category yield history."""
+    if os.path.exists(CATEGORY_STATS_FILE):
+        with open(CATEGORY_STATS_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_category_stats(stats):
+    """Persist per-category yield history."""
+    with _store_lock:
+        with open(CATEGORY_STATS_FILE, "w") as f:
+            json.dump(stats, f, indent=2, sort_keys=True)
+
+
+def record_category_run(stats, cat_name, new_listings, requests_used):
+    """Fold one run's fresh listings per request into the category's EWMA."""
+    if not requests_used:
+        return
+    observed = new_listings / requests_used
+    entry = stats.setdefault(cat_name, {"yield": observed, "runs": 0})
+    entry["yield"] += YIELD_SMOOTHING * (observed - entry["yield"])
+    entry["runs"] += 1
+    entry["last_new"] = new_listings
+    entry["last_requests"] = requests_used
+    entry["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+def allocate_budget(cats, stats, budget, key=lambda name: name):
+    """Split a request budget across categories by expected fresh listings.
+
+    Every category first gets MIN_CATEGORY_REQUESTS so none goes stale.
+    When the budget cannot cover every floor, the categories whose
+    last_run is oldest (or missing) get it first, so the floor rotates
+    through all categories over successive runs. The rest is handed out one page's worth (LISTINGS_PER_PAGE + 1
+    requests) at a time to the category with the highest marginal value:
+    its learned yield, discounted by BUDGET_DECAY for each chunk it already
+    received. key maps a category name to its stats key. Returns
+    {category: requests}, highest yield first.
+    """
+    def expected_yield(name):
+        return stats.get(key(name), {}).get("yield", PRIOR_YIELD)
+
+    def last_run(name):
+        return stats.get(key(name), {}).get("last_run", "")
+
+    allocation = {name: 0 for name in cats}
+    remaining = budget
+    by_yield = sorted(cats, key=expected_yield, reverse=True)
+    for name in sorted(by_yield, key=last_run):
+        grant = min(MIN_CATEGORY_REQUESTS, remaining)
+        allocation[name] = grant
+        remaining -= grant
+
+    chunk = LISTINGS_PER_PAGE + 1
+    heap = [(-expected_yield(name), name) for name in cats]
+    heapq.heapify(heap)
+    while remaining > 0 and heap:
+        value, name = heapq.heappop(heap)
+        if value == 0:
+            break
+        grant = min(chunk, remaining)
+        allocation[name] += grant
+        remaining -= grant
+        heapq.heappush(heap, (value * BUDGET_DECAY, name))
+
+    return dict(sorted(allocation.items(),
+                       key=lambda item: expected_yield(item[0]), reverse=True))
+
+
+# ---------------------------------------------------------------------------
+# Daemon mode
+# ---------------------------------------------------------------------------
+
+
+def write_status(status):
+    """Atomically replace the daemon status file."""
+    tmp = f"{DAEMON_STATUS_FILE}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp, DAEMON_STATUS_FILE)
+
+
+def read_control_requests():
+    """Consume the control file and return its non-empty lines."""
+    if not os.path.exists(DAEMON_CONTROL_FILE):
+        return []
+    tmp = f"{DAEMON_CONTROL_FILE}.processing"
+    os.replace(DAEMON_CONTROL_FILE, tmp)  # writers appending now start a new file
+    with open(tmp, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    os.remove(tmp)
+    return lines
+
+
+class _DaemonStop(BaseException):
+    """Leaves run_daemon's loop on "stop" or SIGTERM.
+
+    A BaseException so the per-job error handling does not swallow it.
+    """
+
+
+def run_daemon(session, cats, scraped_ids, output_file, delay_override=None,
+               refresh_interval=None, stream=False):
+    """Keep crawling categories on their refresh intervals until stopped.
+
+    The session (and its pooled connections), the robots.txt cache and the
+    scraped ID set stay in memory between runs; robots.txt is re-read every
+    ROBOTS_TTL seconds. Progress is reported in DAEMON_STATUS_FILE.
+
+    Lines appended to DAEMON_CONTROL_FILE are handled between jobs:
+    a category keyword (or "all") schedules an immediate refresh, "stop"
+    shuts the daemon down. SIGTERM stops it the same way, mid-job too.
+    A job that fails is logged and retried after DAEMON_RETRY_DELAY.
+    """
+    now = time.time()
+    default_interval = refresh_interval or DEFAULT_REFRESH_INTERVAL
+    intervals = {
+        name: min(CATEGORY_REFRESH_INTERVALS.get(name, default_interval),
+                  default_interval)
+        for name in cats
+    }
+    next_run = {name: now for name in cats}
+    status = {
+        "pid": os.getpid(),
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now)),
+        "state": "idle",
+        "scraped_total": 0,
+        "categories": {name: {"interval": intervals[name]} for name in cats},
+    }
+
+    def update_status(state):
+        status["state"] = state
+        status["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        status["known_ids"] = len(scraped_ids)
+        for name, due in next_run.items():
+            status["categories"][name]["next_run"] = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.gmtime(due))
+        write_status(status)
+
+    def terminate(signum, frame):
+        raise _DaemonStop
+
+    print(f"  Daemon: {len(cats)} categories, status in {DAEMON_STATUS_FILE}, "
+          f"requests via {DAEMON_CONTROL_FILE}")
+    update_status("idle")
+
+    previous_handler = signal.signal(signal.SIGTERM, terminate)
+    try:
+        while True:
+            for request in read_control_requests():
+                if request.lower() == "stop":
+                    raise _DaemonStop
+                matched = [name for name in cats
+                           if request.lower() == "all"
+                           or request.lower() in name.lower()]
+                if not matched:
+                    print(f"\n  Ignoring control request: {request!r}")
+                for name in matched:
+                    next_run[name] = time.time()
+
+            due = min(next_run, key=next_run.get)
+            wait = next_run[due] - time.time()
+            if wait > 0:
+                update_status("idle")
+                time.sleep(min(wait, DAEMON_POLL_INTERVAL))
+                continue
+
+            expire_robots_cache()
+            crawl_delay = delay_override if delay_override is not None \
+                else get_crawl_delay()
+            update_status(f"scraping {due}")
+            usage = {}
+            try:
+                count = scrape_subcategory(
+                    session, due, cats[due], scraped_ids, output_file,
+                    crawl_delay, stream=stream, usage=usage,
+                )
+                stats = load_category_stats()
+                record_category_run(stats, due, count, usage.get("requests"))
+                save_category_stats(stats)
+            except Exception as e:
+                print(f"\n  {due} failed: {e!r}")
+                failed = time.time()
+                next_run[due] = failed + min(DAEMON_RETRY_DELAY, intervals[due])
+                status["categories"][due]["last_error"] = (
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(failed))} "
+                    f"{e!r}"
+                )
+                save_progress(scraped_ids)
+                update_status("idle")
+                continue
+            finished = time.time()
+            next_run[due] = finished + intervals[due]
+            status["scraped_total"] += count
+            status["categories"][due].update({
+                "last_run": time.strftime("%Y-%m-%d %H:%M:%S",
+                                          time.gmtime(finished)),
+                "last_count": count,
+            })
+            update_status("idle")
+    except _DaemonStop:
+        print("\n  Stop requested.")
+    except KeyboardInterrupt:
+        print("\n  Interrupted.")
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        save_progress(scraped_ids)
+        update_status("stopped")
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
 
 def main():
+    global _record_pages_dir, _table_writer
+
     parser = argparse.ArgumentParser(
         description="Scrape food processing machines from machineseeker.com (legally)"
     )
@@ -548,83 +1627,278 @@ def main():
         "--category", type=str, default=None,
         help="Scrape only categories matching this keyword",
     )
+    parser.add_argument(
+        "--source", choices=sorted(SOURCES), action="append", default=None,
+        help=f"Marketplace to crawl; repeat to crawl several in parallel "
+             f"over one connection pool (default: {DEFAULT_SOURCE})",
+    )
     parser.add_argument(
         "--delay", type=float, default=None,
         help="Override crawl delay in seconds (default: from robots.txt)",
     )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Parse detail pages while downloading and stop once all "
+             "needed fields were seen (less memory and bandwidth)",
+    )
+    parser.add_argument(
+        "--discovery", choices=["categories", "sitemap"], default="categories",
+        help="Find listings by paginating category pages (default) or via "
+             "the sitemaps in robots.txt, refreshing only changed listings",
+    )
+    parser.add_argument(
+        "--budget", type=int, default=None,
+        help="Max requests this run, shared out across categories by "
+             "their learned yield of new listings",
+    )
+    parser.add_argument(
+        "--parquet", type=str, default=None, metavar="DIR",
+        help="Also write this run's listings to a new Parquet part file "
+             "in DIR, next to earlier runs' parts (needs pyarrow)",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Keep running and re-crawl each category on its refresh interval",
+    )
+    parser.add_argument(
+        "--refresh-interval", type=float, default=None,
+        help="Daemon refresh interval per category in hours "
+             f"(default: {DEFAULT_REFRESH_INTERVAL // 3600}, "
+             "some categories refresh more often)",
+    )
+    parser.add_argument(
+        "--profile", type=str, default=None, metavar="DIR",
+        help="Profile the run per phase; writes pstats files, collapsed "
+             "stacks for flamegraphs and a summary to DIR",
+    )
+    parser.add_argument(
+        "--profile-mode", choices=["cprofile", "sampling"], default="cprofile",
+        help="cprofile: exact per-phase call stats (slower); sampling: "
+             "stack samples only, low overhead (default: cprofile)",
+    )
+    parser.add_argument(
+        "--profile-memory", action="store_true",
+        help="With --profile, also trace allocations with tracemalloc",
+    )
+    parser.add_argument(
+        "--record-pages", type=str, default=None, metavar="DIR",
+        help="Save fetched detail pages to DIR for later --reparse",
+    )
+    parser.add_argument(
+        "--reparse", type=str, default=None, metavar="DIR",
+        help="Parse pages saved with --record-pages instead of crawling",
+    )
     args = parser.parse_args()
+    args.source = list(dict.fromkeys(args.source or [DEFAULT_SOURCE]))
+    if args.daemon and args.discovery == "sitemap":
+        parser.error("--daemon works with category discovery only")
+    if args.daemon:
+        # Each job crawls a whole category; a long-lived Parquet writer
+        # would only produce a readable file once the daemon stops
+        for option in ["limit", "budget", "parquet"]:
+            if getattr(args, option) is not None:
+                parser.error(f"--{option} cannot be used with --daemon")
+    if args.source != [DEFAULT_SOURCE]:
+        if args.daemon or args.discovery == "sitemap":
+            parser.error(f"--daemon and sitemap discovery support "
+                         f"--source {DEFAULT_SOURCE} only")
+        if args.profile and len(args.source) > 1:
+            parser.error("--profile works with a single --source")
+
+    if args.profile:
+        profiling.start(args.profile,
+                        deterministic=args.profile_mode == "cprofile",
+                        trace_memory=args.profile_memory)
+    try:
+        if args.reparse:
+            reparse_pages(args.reparse)
+        else:
+            if args.record_pages:
+                os.makedirs(args.record_pages, exist_ok=True)
+                _record_pages_dir = args.record_pages
+            if args.parquet:
+                from export_parquet import ListingTableWriter
+                # The CSV resumes across runs; each run adds its own part
+                # (the pid keeps runs started in the same second apart)
+                os.makedirs(args.parquet, exist_ok=True)
+                stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+                part = os.path.join(
+                    args.parquet, f"part-{stamp}-{os.getpid()}.parquet",
+                )
+                _table_writer = ListingTableWriter(part)
+            run(args)
+    finally:
+        if _table_writer is not None:
+            _table_writer.close()
+            print(f"Parquet: {_table_writer.path}")
+        if args.profile:
+            profiling.stop()
+            print(f"Profile written to {args.profile}/")
+
+
+def crawl_source(session, adapter, cats, scraped_ids, stats, args,
+                 crawl_delay):
+    """Crawl the selected categories of one source; returns new listings.
+
+    --limit and --budget apply per source. Requests a category leaves
+    unused are carried over to the next one.
+    """
+    total_scraped = 0
+    remaining_limit = args.limit
+    budgets = allocate_budget(cats, stats, args.budget, key=adapter.key) \
+        if args.budget else {}
+    order = budgets or cats
+    carry = 0
+    for cat_name in tqdm(order, desc=f"{adapter.label} categories"):
+        per_cat_limit = remaining_limit if remaining_limit else None
+        budget = budgets[cat_name] + carry if budgets else None
+        if budgets and not budget:
+            continue
+
+        usage = {}
+        count = scrape_subcategory(
+            session, cat_name, cats[cat_name], scraped_ids,
+            args.output, crawl_delay, limit=per_cat_limit,
+            stream=args.stream, budget=budget, usage=usage,
+            adapter=adapter,
+        )
+        if budgets:
+            carry = max(budget - usage.get("requests", 0), 0)
+        with _store_lock:
+            record_category_run(stats, adapter.key(cat_name), count,
+                                usage.get("requests"))
+            save_category_stats(stats)
 
+        total_scraped += count
+        if remaining_limit is not None:
+            remaining_limit -= count
+            if remaining_limit <= 0:
+                break
+    return total_scraped
+
+
+def crawl_sources(session, adapters, source_cats, scraped_ids, stats, args,
+                  crawl_delays):
+    """Crawl several sources in parallel, one thread per source.
+
+    Sources are separate hosts, each with its own rate controller, so they
+    crawl side by side over the shared session's connection pool.
+    """
+    with ThreadPoolExecutor(max_workers=len(adapters)) as pool:
+        futures = [
+            pool.submit(crawl_source, session, adapter,
+                        source_cats[adapter.name], scraped_ids, stats, args,
+                        crawl_delays[adapter.name])
+            for adapter in adapters
+        ]
+        return sum(future.result() for future in futures)
+
+
+def run(args):
+    """Crawl according to the parsed command line arguments."""
     # Fresh start
     if args.fresh:
-        for f in [PROGRESS_FILE, args.output]:
+        clear_progress()
+        for f in [args.output, SITEMAP_STATE_FILE]:
             if os.path.exists(f):
                 os.remove(f)
-        scraped_ids = set()
-    else:
-        scraped_ids = load_progress()
+    scraped_ids = load_progress()
 
     init_csv(args.output)
     session = get_session()
+    adapters = [SOURCES[name] for name in args.source]
 
-    # Get crawl delay from robots.txt or override
-    crawl_delay = args.delay if args.delay is not None else get_crawl_delay()
+    # Get crawl delay per source from robots.txt or override
+    crawl_delays = {
+        adapter.name: args.delay if args.delay is not None
+        else adapter.crawl_delay()
+        for adapter in adapters
+    }
 
     # Filter categories
-    if args.category:
-        cats = {
-            k: v for k, v in SUBCATEGORIES.items()
-            if args.category.lower() in k.lower()
-        }
-        if not cats:
-            print(f"No category matching '{args.category}'. Available:")
-            for name in sorted(SUBCATEGORIES.keys()):
+    source_cats = {}
+    for adapter in adapters:
+        cats = adapter.categories
+        if args.category:
+            cats = {
+                k: v for k, v in cats.items()
+                if args.category.lower() in k.lower()
+            }
+        if cats:
+            source_cats[adapter.name] = cats
+    if not source_cats:
+        print(f"No category matching '{args.category}'. Available:")
+        for adapter in adapters:
+            for name in sorted(adapter.categories.keys()):
                 print(f"  - {name}")
-            sys.exit(1)
-    else:
-        cats = SUBCATEGORIES
+        sys.exit(1)
+    adapters = [a for a in adapters if a.name in source_cats]
 
     # Print scraping plan
     print("=" * 60)
     print(f"  MachinesBridge Scraper v{BOT_VERSION}")
     print("=" * 60)
-    print(f"  Source:      {BASE_URL}")
+    for adapter in adapters:
+        print(f"  Source:      {adapter.base_url}")
+        print(f"  Crawl delay: {crawl_delays[adapter.name]}s (from robots.txt)")
+        print(f"  Categories:  {len(source_cats[adapter.name])}")
     print(f"  User-Agent:  {USER_AGENT}")
-    print(f"  Crawl delay: {crawl_delay}s (from robots.txt)")
-    print(f"  Categories:  {len(cats)}")
+    print(f"  Discovery:   {args.discovery}")
+    if args.daemon:
+        print("  Mode:        daemon")
     if scraped_ids:
         print(f"  Resuming:    {len(scraped_ids)} already scraped")
     if args.limit:
-        print(f"  Limit:       {args.limit} listings")
+        print(f"  Limit:       {args.limit} listings per source")
+    if args.budget:
+        print(f"  Budget:      {args.budget} requests per source")
     print(f"  Output:      {args.output}")
     print()
     print("  Legal: Honest UA, robots.txt checked, no descriptions scraped")
     print("=" * 60)
     print()
 
-    total_scraped = 0
-    remaining_limit = args.limit
-
-    for cat_name, cat_info in tqdm(cats.items(), desc="Categories"):
-        per_cat_limit = remaining_limit if remaining_limit else None
-
-        count = scrape_subcategory(
-            session, cat_name, cat_info, scraped_ids,
-            args.output, crawl_delay, limit=per_cat_limit,
+    # Daemon and sitemap discovery are machineseeker only (checked in main)
+    cats = source_cats.get(DEFAULT_SOURCE, {})
+    crawl_delay = crawl_delays.get(DEFAULT_SOURCE)
+
+    if args.daemon:
+        interval = args.refresh_interval * 3600 if args.refresh_interval else None
+        run_daemon(session, cats, scraped_ids, args.output,
+                   delay_override=args.delay, refresh_interval=interval,
+                   stream=args.stream)
+        scraped_ids.close()
+        return
+
+    if args.discovery == "sitemap":
+        total_scraped = scrape_sitemaps(
+            session, cats, scraped_ids, args.output, crawl_delay,
+            limit=args.limit, stream=args.stream,
         )
-
-        total_scraped += count
-        if remaining_limit is not None:
-            remaining_limit -= count
-            if remaining_limit <= 0:
-                break
+    else:
+        stats = load_category_stats()
+        if len(adapters) == 1:
+            adapter = adapters[0]
+            total_scraped = crawl_source(
+                session, adapter, source_cats[adapter.name], scraped_ids,
+                stats, args, crawl_delays[adapter.name],
+            )
+        else:
+            total_scraped = crawl_sources(session, adapters, source_cats,
+                                          scraped_ids, stats, args,
+                                          crawl_delays)
 
     print(f"\nDone! Scraped {total_scraped} new listings.")
     print(f"Total in progress: {len(scraped_ids)}")
     print(f"Output: {args.output}")
+    scraped_ids.close()
 
-    if args.limit is None and not args.category:
+    # Budgeted and sitemap runs are partial by design; keep their progress
+    complete = (args.limit is None and not args.category and not args.budget
+                and args.discovery != "sitemap")
+    if complete:
         if os.path.exists(PROGRESS_FILE):
-            os.remove(PROGRESS_FILE)
+            clear_progress()
             print("Full scrape complete — progress file cleaned up.")
 
 
@@ -392,7 +392,8 @@ const machines = data
     const cat = CATEGORY_MAP[row.category] || "mixing";
     const hs = HS_MAP[cat];
     const condition = mapCondition(row.condition);
-    const englishName = translateTitle(row.title);
+    // Prefer the translations precomputed by translate_listings.py
+    const englishName = row.title_en || translateTitle(row.title);
     return {
       id: i + 1,
       name: englishName,
@@ -400,8 +401,11 @@ const machines = data
       brand: row.manufacturer || "Unknown",
       year: row.year ? parseInt(row.year, 10) : null,
       condition,
-      price: parsePrice(row.price),
-      location: translateLocation(row.location),
+      // Prefer the exact EUR value precomputed by normalize_prices.py
+      price: row.price_eur ? Number(row.price_eur) : parsePrice(row.price),
+      location: row.location_en
+        ? row.location_en.replace(/"/g, "")
+        : translateLocation(row.location),
       source: row.source || SOURCES[i % SOURCES.length],
       image: EMOJI_MAP[cat],
       imageUrl: getImageUrl(cat),
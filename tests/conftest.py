@@ -0,0 +1,6 @@
+"""Lets the tests import the scripts in the repo root (scraper, listing_ids, ...)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+"""Splitting a --budget across categories."""
+
+import argparse
+
+import scraper
+
+CHUNK = scraper.LISTINGS_PER_PAGE + 1
+FLOOR = scraper.MIN_CATEGORY_REQUESTS
+
+
+def test_budget_goes_to_high_yield_categories():
+    cats = {"a": {}, "b": {}, "c": {}}
+    stats = {"a": {"yield": 0.9}, "b": {"yield": 0.1}, "c": {"yield": 0.0}}
+    budget = 3 * FLOOR + 2 * CHUNK
+
+    allocation = scraper.allocate_budget(cats, stats, budget)
+
+    assert list(allocation) == ["a", "b", "c"]
+    assert allocation == {"a": FLOOR + 2 * CHUNK, "b": FLOOR, "c": FLOOR}
+
+
+def test_later_chunks_are_discounted():
+    stats = {"a": {"yield": 0.5}, "b": {"yield": 0.45}}
+    allocation = scraper.allocate_budget({"a": {}, "b": {}}, stats,
+                                         2 * FLOOR + 2 * CHUNK)
+    assert allocation == {"a": FLOOR + CHUNK, "b": FLOOR + CHUNK}
+
+
+def test_unknown_categories_get_the_prior_yield():
+    stats = {"a": {"yield": scraper.PRIOR_YIELD / 2}}
+    allocation = scraper.allocate_budget({"a": {}, "new": {}}, stats,
+                                         2 * FLOOR + CHUNK)
+    assert allocation["new"] == FLOOR + CHUNK
+
+
+def test_small_budget_rotates_the_floor():
+    cats = {f"c{i}": {} for i in range(40)}
+    stats = {name: {"yield": i / 10} for i, name in enumerate(cats)}
+    budget = 50  # floors for 25 of the 40 categories
+    visited = set()
+    for run in range(2):
+        allocation = scraper.allocate_budget(cats, stats, budget)
+        assert sum(allocation.values()) == budget
+        for name, requests in allocation.items():
+            if requests:
+                visited.add(name)
+                stats[name]["last_run"] = f"2026-01-0{run + 1} 00:00:00"
+    assert visited == set(cats)
+
+
+def test_unused_requests_carry_over(monkeypatch):
+    cats = {"a": {}, "b": {}}
+    stats = {"a": {"yield": 0.9, "runs": 1}, "b": {"yield": 0.1, "runs": 1}}
+    budgets = {}
+
+    def scrape_subcategory(session, cat_name, cat_info, scraped_ids,
+                           output_file, crawl_delay, budget=None, usage=None,
+                           **kwargs):
+        budgets[cat_name] = budget
+        usage["requests"] = 1  # a one-page category
+        return 0
+
+    monkeypatch.setattr(scraper, "scrape_subcategory", scrape_subcategory)
+    monkeypatch.setattr(scraper, "save_category_stats", lambda stats: None)
+    args = argparse.Namespace(limit=None, budget=2 * FLOOR + CHUNK,
+                              stream=False, output="machines.csv")
+    adapter = scraper.SOURCES[scraper.DEFAULT_SOURCE]
+
+    scraper.crawl_source(None, adapter, cats, set(), stats, args, 0)
+
+    assert budgets["a"] == FLOOR + CHUNK
+    assert budgets["b"] == FLOOR + (FLOOR + CHUNK - 1)
@@ -0,0 +1,39 @@
+"""ListingIdSet shared by two processes (two handles on one path)."""
+
+from listing_ids import ListingIdSet
+
+
+def test_compaction_keeps_ids_saved_by_another_handle(tmp_path):
+    path = str(tmp_path / "progress.ids")
+    daemon = ListingIdSet(path)
+    daemon.add("1")
+    daemon.compact()
+
+    cron = ListingIdSet(path)  # opens the base holding "1"
+    daemon.add("2")
+    daemon.compact()  # new base: 1, 2
+    daemon.add("3")
+    daemon.save()  # journal: 3
+
+    cron.add("4")
+    cron.close()  # merges on top of the current base and journal
+
+    merged = ListingIdSet(path)
+    assert all(key in merged for key in ["1", "2", "3", "4"])
+    assert len(merged) == 4
+    for ids in (daemon, merged):
+        ids.close()
+
+
+def test_keys_survive_reopen(tmp_path):
+    path = str(tmp_path / "progress.ids")
+    ids = ListingIdSet(path)
+    for key in ["20409965", "17900386", "stub:abc"]:
+        ids.add(key)
+    ids.save()
+
+    reopened = ListingIdSet(path)  # replays the journal
+    assert "stub:abc" in reopened and "20409965" in reopened
+    assert "stub:abd" not in reopened and "5586144" not in reopened
+    reopened.close()
+    ids.close()
@@ -0,0 +1,49 @@
+"""Price parsing and FX lookups."""
+
+from decimal import Decimal
+
+import pytest
+
+import normalize_prices
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1.250", Decimal("1250")),
+    ("1.250,50", Decimal("1250.50")),
+    ("1,250.50", Decimal("1250.50")),
+    ("12.345.678", Decimal("12345678")),
+    ("0.500", Decimal("0.5")),
+    ("7,5", Decimal("7.5")),
+    ("750", Decimal("750")),
+    ("Preisinfo", None),
+    ("", None),
+])
+def test_parse_price_value(raw, expected):
+    assert normalize_prices.parse_price_value(raw) == expected
+
+
+@pytest.fixture
+def fx(tmp_path):
+    path = tmp_path / "fx_rates.csv"
+    path.write_text(
+        "date,currency,per_eur\n"
+        "2026-03-01,USD,1.10\n"
+        "2026-02-01,USD,1.08\n"
+        "2026-02-01,INR,89.5\n",
+        encoding="utf-8",
+    )
+    return normalize_prices.FxTable(str(path))
+
+
+def test_rate_in_effect_on_date(fx):
+    assert fx.rate("USD", "2026-02-15") == (Decimal("1.08"), "2026-02-01")
+    assert fx.rate("USD", "2026-03-01") == (Decimal("1.10"), "2026-03-01")
+    assert fx.rate("USD", "") == (Decimal("1.10"), "2026-03-01")
+
+
+def test_dates_before_first_rate_use_the_oldest(fx):
+    assert fx.rate("USD", "2025-12-31") == (Decimal("1.08"), "2026-02-01")
+
+
+def test_unknown_currency_has_no_rate(fx):
+    assert fx.rate("CHF", "2026-02-15") == (None, "")
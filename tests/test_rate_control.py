@@ -0,0 +1,73 @@
+"""Retry-After parsing and the per-host AIMD delay controller."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import scraper
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120),
+    (" 0 ", 0),
+    ("999999", scraper.MAX_RETRY_AFTER),
+    ("", None),
+    (None, None),
+    ("soon", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert scraper.parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=90)
+    seconds = scraper.parse_retry_after(format_datetime(when, usegmt=True))
+    assert 85 <= seconds <= 90
+
+
+def test_parse_retry_after_date_in_the_past():
+    when = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert scraper.parse_retry_after(format_datetime(when, usegmt=True)) == 0
+
+
+def test_failures_double_the_delay_up_to_the_cap():
+    controller = scraper.HostRateController(1)
+    controller.record_failure()
+    assert controller.delay == 1 * scraper.DELAY_BACKOFF_FACTOR
+    for _ in range(20):
+        controller._back_off()
+    assert controller.delay == scraper.MAX_CRAWL_DELAY
+
+
+def test_successes_recover_to_the_crawl_delay():
+    controller = scraper.HostRateController(1)
+    controller.record_failure()
+    for _ in range(10):
+        controller.record_success(0.1)
+    assert controller.delay == 1
+    assert controller.failures == 0
+
+
+def test_slow_responses_back_off():
+    controller = scraper.HostRateController(1)
+    controller.record_success(scraper.SLOW_RESPONSE_SECONDS * 2)
+    assert controller.delay == 1 * scraper.DELAY_BACKOFF_FACTOR
+
+
+def test_breaker_opens_after_repeated_failures():
+    controller = scraper.HostRateController(1)
+    for _ in range(scraper.BREAKER_FAILURE_THRESHOLD - 1):
+        controller.record_failure()
+    assert not controller.is_open()
+    controller.record_failure()
+    assert controller.is_open()
+    controller.record_success(0.1)
+    assert not controller.is_open()
+
+
+def test_retry_after_pushes_back_the_next_slot():
+    controller = scraper.HostRateController(0)
+    controller.record_failure(retry_after=30)
+    assert controller.not_before >= time.monotonic() + 29
@@ -0,0 +1,68 @@
+"""Sitemap discovery across runs over different category selections."""
+
+import pytest
+from bs4 import BeautifulSoup
+
+import listing_ids
+import scraper
+
+BAKERY = "Bakery machines & pastry equipment"
+MEAT = "Meat processing machines"
+
+SITEMAPS = {
+    "https://m/sitemap.xml": [
+        ("sitemap", "https://m/sitemap-misc.xml", "2026-01-01"),
+    ],
+    "https://m/sitemap-misc.xml": [
+        ("url", "https://m/kemper-sp50/i-111", "2026-01-01"),
+    ],
+}
+BREADCRUMB = {"111": 300}  # ci- ID on the listing's detail page
+
+
+@pytest.fixture
+def crawl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "get_sitemap_urls", lambda: ["https://m/sitemap.xml"])
+    monkeypatch.setattr(scraper, "iter_sitemap",
+                        lambda session, url, delay: iter(SITEMAPS[url]))
+    fetched = []
+
+    def fetch_detail(session, url, delay, stream=False, usage=None):
+        fetched.append(url)
+        ci = BREADCRUMB[scraper.extract_listing_id(url)]
+        return BeautifulSoup(f'<a href="/x/ci-{ci}">category</a>', "lxml")
+
+    monkeypatch.setattr(scraper, "fetch_detail", fetch_detail)
+    scraper.init_csv("machines.csv")
+
+    def run(cats):
+        fetched.clear()
+        ids = listing_ids.ListingIdSet(scraper.PROGRESS_FILE)
+        count = scraper.scrape_sitemaps(None, cats, ids, "machines.csv", 0)
+        ids.close()
+        return count, list(fetched)
+
+    return run
+
+
+def test_listing_seen_by_another_selection_is_scraped_later(crawl):
+    meat = {MEAT: scraper.SUBCATEGORIES[MEAT]}
+    assert crawl(meat) == (0, ["https://m/kemper-sp50/i-111"])
+
+    count, fetched = crawl(scraper.SUBCATEGORIES)
+    assert count == 1
+    assert fetched == ["https://m/kemper-sp50/i-111"]
+
+    assert crawl(scraper.SUBCATEGORIES) == (0, [])
+
+
+def test_sitemap_state_records_covered_categories(crawl):
+    crawl(scraper.SUBCATEGORIES)
+    state = scraper.load_sitemap_state()
+    entry = state["sitemaps"]["https://m/sitemap-misc.xml"]
+    assert entry["lastmod"] == "2026-01-01"
+    assert set(entry["cats"]) == set(scraper.SUBCATEGORIES)
+    assert state["listings"]["111"] == {
+        "lastmod": "2026-01-01", "category": BAKERY, "scraped": True,
+    }
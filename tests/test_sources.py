@@ -0,0 +1,129 @@
+"""Several source adapters crawling in parallel over one session."""
+
+import argparse
+import csv
+import threading
+import time
+
+import pytest
+
+import listing_ids
+import scraper
+
+BAKERY = "Bakery machines & pastry equipment"
+
+
+class StubAdapter(scraper.SourceAdapter):
+    """A second marketplace on its own host."""
+
+    name = "stub"
+    label = "Stub"
+    base_url = "https://stub.example"
+    categories = {"Paper machines": {"path": "/paper"}}
+    listings_per_page = 2
+
+    def category_url(self, cat_info, page=1):
+        return f"{self.base_url}{cat_info['path']}?page={page}"
+
+    def extract_listing_urls(self, soup):
+        return [a["href"] for a in soup.find_all("a", class_="listing")]
+
+    def extract_listing_id(self, url):
+        return url.rsplit("/", 1)[-1]
+
+    def parse_detail(self, soup, url, category):
+        row = {field: "" for field in scraper.CSV_FIELDS}
+        row.update(title=soup.h1.get_text(), listing_id=self.extract_listing_id(url),
+                   category=category, detail_url=url, source=self.label)
+        return row
+
+
+PAGES = {
+    "https://stub.example/paper?page=1":
+        '<a class="listing" href="https://stub.example/p/1">1</a>',
+    "https://stub.example/p/1": "<h1>Paper cutter</h1>",
+    scraper.build_category_url("Bakery-pastry-equipment", 300):
+        '<a href="/dough-mixer/i-11">mixer</a>',
+    f"{scraper.BASE_URL}/dough-mixer/i-11":
+        "<dl><dt>Manufacturer</dt><dd>Kemper</dd></dl>",
+}
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    headers = {}
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self):
+        self.threads = {}  # host -> thread names that fetched it
+
+    def get(self, url, timeout=None, stream=False):
+        host = scraper.urlparse(url).netloc
+        self.threads.setdefault(host, set()).add(threading.current_thread().name)
+        return FakeResponse(PAGES.get(url, ""))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "check_robots", lambda url: True)
+    monkeypatch.setattr(scraper, "_rate_controllers", {})
+    return tmp_path
+
+
+def test_sources_crawl_in_parallel_threads(workdir):
+    stub = StubAdapter()
+    machineseeker = scraper.SOURCES[scraper.DEFAULT_SOURCE]
+    adapters = [machineseeker, stub]
+    source_cats = {
+        machineseeker.name: {BAKERY: scraper.SUBCATEGORIES[BAKERY]},
+        stub.name: stub.categories,
+    }
+    args = argparse.Namespace(limit=None, budget=None, stream=False,
+                              output="machines.csv")
+    scraper.init_csv(args.output)
+    scraped_ids = listing_ids.ListingIdSet(scraper.PROGRESS_FILE)
+    stats = {}
+    session = FakeSession()
+
+    total = scraper.crawl_sources(session, adapters, source_cats, scraped_ids,
+                                  stats, args, {"machineseeker": 0, "stub": 0})
+
+    assert total == 2
+    assert "11" in scraped_ids and "stub:1" in scraped_ids
+    assert "1" not in scraped_ids
+    assert set(stats) == {BAKERY, "stub:Paper machines"}
+    with open(args.output, newline="", encoding="utf-8") as f:
+        rows = {row["source"]: row for row in csv.DictReader(f)}
+    assert rows["Stub"]["title"] == "Paper cutter"
+    assert rows["Machineseeker"]["manufacturer"] == "Kemper"
+
+    threads = session.threads
+    assert all(name.startswith("ThreadPoolExecutor") for names in threads.values()
+               for name in names)
+    assert threads["stub.example"].isdisjoint(threads["www.machineseeker.com"])
+    scraped_ids.close()
+
+
+def test_rate_controller_spaces_threads_on_one_host():
+    controller = scraper.HostRateController(0.2)
+    started = []
+
+    def request():
+        controller.wait()
+        started.append(time.monotonic())
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    started.sort()
+    gaps = [b - a for a, b in zip(started, started[1:])]
+    assert min(gaps) >= 0.19
@@ -0,0 +1,125 @@
+"""Streamed detail parsing must match a full parse of the same page."""
+
+from bs4 import BeautifulSoup
+
+import requests
+
+import scraper
+
+URL = "https://www.machineseeker.com/dough-mixer/i-12345678"
+
+NAV = """
+<nav class="filters">
+  <a>Manufacturer</a> <a>Model</a> <a>Condition</a> <a>Location</a>
+  <a>Year built</a> <div class="price-filter">Price</div>
+</nav>
+"""
+
+SPECS = """
+<dl class="specs">
+  <dt>Machine type</dt><dd>Dough mixer</dd>
+  <dt>Manufacturer</dt><dd>Kemper</dd>
+  <dt>Model</dt><dd>SP 50</dd>
+  <dt>Year of manufacture</dt><dd>2015</dd>
+  <dt>Condition</dt><dd>used</dd>
+  <dt>Dimensions</dt><dd><span>1.2 x 0.8 x 1.4 m</span></dd>
+  <dt>Weight</dt><dd>540 kg</dd>
+  <dt>Input voltage</dt><dd>400 V</dd>
+  <dt>Power</dt><dd>7.5 kW</dd>
+  <dt>Input current</dt><dd>16 A</dd>
+  <dt>Input frequency</dt><dd>50 Hz</dd>
+  <dt>Price</dt><dd>19.000 € plus VAT</dd>
+  <dt>Location</dt><dd>Rheine, Germany</dd>
+  <dt>Country</dt><dd>Germany</dd>
+  <dt>Dealer</dt><dd>Bakery Tech GmbH</dd>
+</dl>
+"""
+
+
+FOOTER = "<footer>" + "<p>filler</p>" * 2000 + "</footer>"
+
+
+def page(before_specs="", after_specs="", seller="Verified dealer"):
+    return f"""<!DOCTYPE html>
+<html><head>
+<meta property="og:image" content="https://cdn.machineseeker.com/1.jpg">
+<script>var x = "<dt>Model</dt>";</script>
+</head><body>
+{before_specs}
+{SPECS}
+<div class="seller"><span>{seller}</span></div>
+{after_specs}
+</body></html>"""
+
+
+class FakeResponse:
+    """The parts of a streamed requests.Response stream_detail_soup uses."""
+
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+    encoding = "utf-8"
+    url = URL
+
+    def __init__(self, body):
+        self.body = body.encode("utf-8")
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            chunk = self.body[i:i + chunk_size]
+            self.read += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def parse_both(body, chunk_size=64):
+    resp = FakeResponse(body)
+    streamed = scraper.parse_detail_page(
+        scraper.stream_detail_soup(resp, chunk_size=chunk_size), URL, "Bakery")
+    full = scraper.parse_detail_page(BeautifulSoup(body, "lxml"), URL, "Bakery")
+    streamed.pop("scraped_at")
+    full.pop("scraped_at")
+    return streamed, full, resp
+
+
+def test_labels_before_spec_table_do_not_stop_the_stream():
+    streamed, full, resp = parse_both(page(before_specs=NAV, after_specs=FOOTER))
+    assert streamed == full
+    assert full["manufacturer"] == "Kemper"
+    assert full["seller_verified"] == "Yes"
+    assert resp.closed
+    assert resp.read < len(resp.body) // 2  # stopped before the footer
+
+
+def test_page_missing_a_spec_stops_after_the_spec_list():
+    body = page(before_specs=NAV, after_specs=FOOTER)
+    body = body.replace("<dt>Input frequency</dt><dd>50 Hz</dd>", "")
+    streamed, full, resp = parse_both(body)
+    assert streamed == full
+    assert "Frequency" not in full["electrical"]
+    assert resp.read < len(resp.body) // 2
+
+
+def test_unverified_seller_stops_after_the_seller_box():
+    # "Verified" further down the page is not about the seller
+    footer = FOOTER + "<p>Verified payment partners</p>"
+    streamed, full, resp = parse_both(page(after_specs=footer,
+                                           seller="Private seller"))
+    assert streamed == full
+    assert full["seller_verified"] == "No"
+    assert resp.read < len(resp.body) // 2
+
+
+class BrokenResponse(FakeResponse):
+    def iter_content(self, chunk_size):
+        yield self.body[:chunk_size]
+        raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+
+def test_stream_errors_return_none():
+    assert scraper.stream_detail_soup(FakeResponse("")) is None
+    resp = BrokenResponse(page())
+    assert scraper.stream_detail_soup(resp, chunk_size=64) is None
+    assert resp.closed
@@ -0,0 +1,40 @@
+"""Dictionary matching in German listing titles."""
+
+import pytest
+
+import translate_listings
+
+TERMS = {
+    "Paddelmischer": "paddle mixer",
+    "Mischer": "mixer",
+    "Teigteiler": "dough divider",
+    "Teig": "dough",
+}
+
+
+@pytest.fixture
+def matcher():
+    return translate_listings.TermMatcher(TERMS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Concatenated title: the camel-case joint is a word boundary
+    ("PaddelmischerZasadaML600", "paddle mixer ZasadaML600"),
+    ("Paddelmischer Zasada", "paddle mixer Zasada"),
+    # Longest match wins over the shorter term inside it
+    ("Teigteiler", "dough divider"),
+    ("Teig-Mischer", "dough-mixer"),
+    # Terms inside a longer lowercase word are left alone
+    ("Teigwaren Mischer", "Teigwaren mixer"),
+    ("Mischerei", "Mischerei"),
+    ("", ""),
+])
+def test_translate(matcher, text, expected):
+    assert matcher.translate(text) == expected
+
+
+def test_is_word():
+    assert translate_listings._is_word("PaddelmischerZasada", 0, 13)
+    assert translate_listings._is_word("Zasada Mischer", 7, 14)
+    assert not translate_listings._is_word("Teigwaren", 0, 4)
+    assert not translate_listings._is_word("Rührmischer", 4, 11)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Translate German listing fields to English with a multi-pattern matcher.
+
+The term dictionary (data/translations_de_en.json) is compiled once into
+an Aho-Corasick automaton per field, so each value is scanned in a single
+pass no matter how many terms the dictionary holds. Matching is
+case-insensitive, and a match has to start and end at a word boundary
+(a non-letter or a lower-to-upper case change). That lets concatenated
+scraper titles like "PaddelmischerZasadaML600" translate without turning
+"Paddelmischer" into "PaddelMixer". Overlapping matches resolve to the
+leftmost, then longest, term.
+
+Rows are processed in batches. Each distinct value is translated once
+and memoized for the rest of the run, since many listings share titles,
+locations and conditions.
+
+Usage:
+    python translate_listings.py machines.csv -o machines_en.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+from collections import deque
+from itertools import islice
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DICTIONARY_FILE = os.path.join(DATA_DIR, "translations_de_en.json")
+
+BATCH_SIZE = 5000  # rows read per batch
+
+# Field -> dictionary sections applied to it; output goes to "<field>_en"
+FIELD_SECTIONS = {
+    "title": ["terms"],
+    "location": ["countries", "cities"],
+    "country": ["countries"],
+    "condition": ["conditions"],
+    "functionality": ["functionality"],
+}
+
+
+def _lower(text):
+    """Lowercase without changing the length (unlike casefold on 'ß')."""
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over a {term: replacement} dictionary."""
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # per node: (term length, replacement)
+        for term, replacement in terms.items():
+            self._add(_lower(term), replacement)
+        self._build()
+
+    def _add(self, term, replacement):
+        node = 0
+        for char in term:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append((len(term), replacement))
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text):
+        """Yield (start, end, replacement) for every dictionary hit."""
+        node = 0
+        for i, char in enumerate(_lower(text)):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, replacement in self.out[node]:
+                yield i + 1 - length, i + 1, replacement
+
+    def translate(self, text):
+        """Replace the leftmost-longest whole-word matches in text."""
+        if not text:
+            return text
+        hits = [hit for hit in self.find(text) if _is_word(text, hit[0], hit[1])]
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        parts, pos = [], 0
+        for start, end, replacement in hits:
+            if start < pos:
+                continue
+            parts.append(text[pos:start])
+            if start and text[start - 1].isalnum():
+                parts.append(" ")
+            parts.append(replacement)
+            if end < len(text) and text[end].isalnum():
+                parts.append(" ")
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+def _is_word(text, start, end):
+    """True if text[start:end] starts and ends at a word boundary."""
+    before = text[start - 1] if start else ""
+    first, last = text[start], text[end - 1]
+    after = text[end] if end < len(text) else ""
+    starts = not before.isalpha() or (before.islower() and first.isupper())
+    ends = not after.isalpha() or (last.islower() and after.isupper())
+    return starts and ends
+
+
+def load_matchers(path=DICTIONARY_FILE):
+    """Compile one matcher per field from the dictionary sections."""
+    with open(path, encoding="utf-8") as f:
+        dictionary = json.load(f)
+    matchers = {}
+    for field, sections in FIELD_SECTIONS.items():
+        terms = {}
+        for section in sections:
+            terms.update(dictionary.get(section, {}))
+        matchers[field] = TermMatcher(terms)
+    return matchers
+
+
+class Translator:
+    """Per-field matchers with memoized results."""
+
+    def __init__(self, matchers):
+        self.matchers = matchers
+        self.memo = {field: {} for field in matchers}
+
+    def translate_batch(self, rows):
+        """Add "<field>_en" to each row, translating each distinct value once."""
+        for field, matcher in self.matchers.items():
+            memo = self.memo[field]
+            for value in {row.get(field) or "" for row in rows} - memo.keys():
+                memo[value] = matcher.translate(value)
+            for row in rows:
+                row[f"{field}_en"] = memo[row.get(field) or ""]
+        return rows
+
+
+def translate_csv(input_path, output_path, translator, batch_size=BATCH_SIZE):
+    """Copy a listings CSV, adding English columns batch by batch."""
+    count = 0
+    with open(input_path, newline="", encoding="utf-8") as src, \
+            open(output_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        fieldnames = list(reader.fieldnames or [])
+        fieldnames += [f"{field}_en" for field in translator.matchers
+                       if f"{field}_en" not in fieldnames]
+        writer = csv.DictWriter(dst, fieldnames=fieldnames)
+        writer.writeheader()
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                break
+            writer.writerows(translator.translate_batch(batch))
+            count += len(batch)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Translate German listing fields to English"
+    )
+    parser.add_argument("csv", help="Listing CSV file")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV file")
+    parser.add_argument(
+        "--dictionary", type=str, default=DICTIONARY_FILE,
+        help="Term dictionary JSON (default: data/translations_de_en.json)",
+    )
+    args = parser.parse_args()
+
+    translator = Translator(load_matchers(args.dictionary))
+    count = translate_csv(args.csv, args.output, translator)
+    distinct = sum(len(memo) for memo in translator.memo.values())
+    print(f"Translated {count} listings ({distinct} distinct values) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()